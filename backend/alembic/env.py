@@ -14,7 +14,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.config import settings
 from app.database import Base
-from app.models import User, Child, Domain, Word, WordTranslation, WordPrerequisite, Progress, ChatSession, ChatMessage
+from app.models import User, RevokedToken, IdempotencyKey, Child, Domain, Word, WordTranslation, WordPrerequisite, WordPrerequisiteClosure, ContentTombstone, Progress, DailyActivity, AttemptEvent, ChatSession, ChatMessage
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,229 @@
+"""Bring the initial schema up to date
+
+Revision ID: 0a5d2c7e9b13
+Revises:
+Create Date: 2026-10-19 02:00:00
+
+Adds everything the models gained on top of the tables the first release
+created with ``create_all``: content versions and update stamps for delta
+sync, normalized translation text for search, the progress uniqueness
+constraint and indexes, and the daily_activity, attempt_events,
+revoked_tokens, content_tombstones and word_prerequisite_closure tables.
+
+The first release allowed several progress rows per (child, word); they
+are merged into one before the unique constraint is added. Attempts and
+correct answers are summed, the furthest status and the earliest unlock
+and mastery times are kept.
+
+Every step checks the catalog first, so a database already built by
+``create_all`` from the current models passes through unchanged. A
+database without tables (fresh, to be built by the seed script) is left
+alone. The attempt_events partitions are created by the app at startup,
+and the closure rows by the following revisions.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.text import normalize_search_text
+
+# revision identifiers, used by Alembic.
+revision: str = "0a5d2c7e9b13"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = (
+    ("ix_children_user_id", "children", ["user_id"]),
+    ("ix_words_domain_updated", "words", ["domain_id", "updated_at"]),
+    ("ix_word_translations_language_search", "word_translations", ["language", "text_normalized"]),
+    ("ix_word_translations_search", "word_translations", ["text_normalized"]),
+    ("ix_word_prerequisites_prerequisite", "word_prerequisites", ["prerequisite_id"]),
+    ("ix_progress_child_status", "progress", ["child_id", "status"]),
+)
+
+# One row per (child, word): the most recently practiced row absorbs the others
+_MERGE_DUPLICATE_PROGRESS = """
+WITH merged AS (
+    SELECT child_id, word_id,
+           (array_agg(id ORDER BY last_practiced_at DESC NULLS LAST, updated_at DESC NULLS LAST, id))[1] AS keep_id,
+           max(status) AS status,
+           sum(coalesce(attempts, 0)) AS attempts,
+           sum(coalesce(correct_count, 0)) AS correct_count,
+           min(unlocked_at) AS unlocked_at,
+           min(mastered_at) AS mastered_at,
+           max(last_practiced_at) AS last_practiced_at,
+           min(created_at) AS created_at,
+           max(updated_at) AS updated_at
+    FROM progress
+    GROUP BY child_id, word_id
+    HAVING count(*) > 1
+),
+kept AS (
+    UPDATE progress p
+    SET status = m.status,
+        attempts = m.attempts,
+        correct_count = m.correct_count,
+        unlocked_at = m.unlocked_at,
+        mastered_at = CASE WHEN m.status = 'MASTERED' THEN m.mastered_at END,
+        last_practiced_at = m.last_practiced_at,
+        created_at = m.created_at,
+        updated_at = m.updated_at
+    FROM merged m
+    WHERE p.id = m.keep_id
+    RETURNING p.id
+)
+DELETE FROM progress p
+USING merged m
+WHERE p.child_id = m.child_id AND p.word_id = m.word_id AND p.id <> m.keep_id
+"""
+
+
+def _has_table(table: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def _has_column(table: str, column: str) -> bool:
+    return any(c["name"] == column for c in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def _has_relation(name: str) -> bool:
+    """Whether an index (or any other relation) with this name exists."""
+    return op.get_bind().execute(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def _has_constraint(name: str) -> bool:
+    return op.get_bind().execute(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = :name)"), {"name": name}
+    ).scalar()
+
+
+def _add_update_stamps() -> None:
+    if not _has_column("domains", "content_version"):
+        op.add_column("domains", sa.Column("content_version", sa.Integer(), nullable=False, server_default="0"))
+        op.alter_column("domains", "content_version", server_default=None)
+    for table in ("words", "word_translations"):
+        if not _has_column(table, "updated_at"):
+            op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+            op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+
+def _add_normalized_text() -> None:
+    if _has_column("word_translations", "text_normalized"):
+        return
+    op.add_column(
+        "word_translations",
+        sa.Column("text_normalized", sa.String(length=200, collation="C"), nullable=True),
+    )
+    # The folding is Unicode-aware Python, so it cannot run as a single UPDATE
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, text FROM word_translations")).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE word_translations SET text_normalized = :text_normalized WHERE id = :id"),
+            [{"id": row.id, "text_normalized": normalize_search_text(row.text)} for row in rows]
+        )
+    op.alter_column("word_translations", "text_normalized", nullable=False)
+
+
+def _make_progress_unique() -> None:
+    if _has_constraint("uq_child_word"):
+        return
+    op.execute(_MERGE_DUPLICATE_PROGRESS)
+    op.create_unique_constraint("uq_child_word", "progress", ["child_id", "word_id"])
+
+
+def _create_tables() -> None:
+    if not _has_table("daily_activity"):
+        op.create_table(
+            "daily_activity",
+            sa.Column("child_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("children.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("domain_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("domains.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("correct_count", sa.Integer(), nullable=False),
+            sa.Column("mastered_count", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("child_id", "day", "domain_id"),
+        )
+    if not _has_table("attempt_events"):
+        op.create_table(
+            "attempt_events",
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("child_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("children.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("word_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("domain_id", postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column("correct", sa.Boolean(), nullable=False),
+            sa.Column(
+                "status",
+                postgresql.ENUM(name="progressstatus", create_type=False),
+                nullable=False
+            ),
+            sa.PrimaryKeyConstraint("id", "created_at"),
+            postgresql_partition_by="RANGE (created_at)",
+        )
+        op.create_index("ix_attempt_events_child_created", "attempt_events", ["child_id", "created_at"])
+    if not _has_table("revoked_tokens"):
+        op.create_table(
+            "revoked_tokens",
+            sa.Column("token_digest", sa.String(length=64), nullable=False),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("revoked_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("token_digest"),
+        )
+        op.create_index("ix_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"])
+    if not _has_table("content_tombstones"):
+        op.create_table(
+            "content_tombstones",
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("domain_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("domains.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("entity_type", sa.String(length=20), nullable=False),
+            sa.Column("entity_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("word_id", postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column("prerequisite_id", postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column("deleted_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_content_tombstones_domain_deleted", "content_tombstones", ["domain_id", "deleted_at"])
+    if not _has_table("word_prerequisite_closure"):
+        op.create_table(
+            "word_prerequisite_closure",
+            sa.Column("ancestor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("words.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("descendant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("words.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("distance", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+        )
+        op.create_index(
+            "ix_word_prerequisite_closure_descendant",
+            "word_prerequisite_closure",
+            ["descendant_id", "distance"],
+        )
+
+
+def upgrade() -> None:
+    if not _has_table("words"):
+        return
+    _add_update_stamps()
+    _add_normalized_text()
+    _make_progress_unique()
+    for name, table, columns in _INDEXES:
+        if not _has_relation(name):
+            op.create_index(name, table, columns)
+    _create_tables()
+
+
+def downgrade() -> None:
+    if not _has_table("words"):
+        return
+    for table in ("word_prerequisite_closure", "content_tombstones", "revoked_tokens", "attempt_events", "daily_activity"):
+        op.execute(f'DROP TABLE IF EXISTS "{table}"')
+    for name, _, _ in _INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS "{name}"')
+    op.execute("ALTER TABLE progress DROP CONSTRAINT IF EXISTS uq_child_word")
+    op.execute("ALTER TABLE word_translations DROP COLUMN IF EXISTS text_normalized")
+    op.execute("ALTER TABLE word_translations DROP COLUMN IF EXISTS updated_at")
+    op.execute("ALTER TABLE words DROP COLUMN IF EXISTS updated_at")
+    op.execute("ALTER TABLE domains DROP COLUMN IF EXISTS content_version")
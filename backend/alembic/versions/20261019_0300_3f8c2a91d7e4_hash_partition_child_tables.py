@@ -0,0 +1,214 @@
+"""Hash-partition progress and chat tables by child
+
+Revision ID: 3f8c2a91d7e4
+Revises: 0a5d2c7e9b13
+Create Date: 2026-10-19 03:00:00
+
+Rebuilds progress, chat_sessions and chat_messages as tables partitioned by
+HASH (child_id) and moves the existing rows across. Postgres cannot turn a
+plain table into a partitioned one in place, so the old tables are renamed,
+copied from and dropped, all in the migration's transaction. Writers to
+these tables are blocked until it commits.
+
+A database without these tables (fresh, to be built by the seed script)
+or whose tables are already partitioned (built by ``create_all``) is left
+alone.
+"""
+from typing import Optional, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.config import get_settings
+from app.services.partition_service import CHILD_PARTITIONED_TABLES, hash_partition_ddl
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8c2a91d7e4"
+down_revision: Union[str, None] = "0a5d2c7e9b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_CREATE_PARTITIONED = (
+    """
+    CREATE TABLE progress (
+        id uuid NOT NULL,
+        child_id uuid NOT NULL CONSTRAINT progress_child_id_fkey REFERENCES children(id) ON DELETE CASCADE,
+        word_id uuid NOT NULL CONSTRAINT progress_word_id_fkey REFERENCES words(id) ON DELETE CASCADE,
+        status progressstatus NOT NULL,
+        attempts integer,
+        correct_count integer,
+        streak_count integer,
+        last_practiced_at timestamp without time zone,
+        unlocked_at timestamp without time zone,
+        mastered_at timestamp without time zone,
+        created_at timestamp without time zone,
+        updated_at timestamp without time zone,
+        CONSTRAINT progress_pkey PRIMARY KEY (id, child_id),
+        CONSTRAINT uq_child_word UNIQUE (child_id, word_id)
+    ) PARTITION BY HASH (child_id)
+    """,
+    "CREATE INDEX ix_progress_child_status ON progress (child_id, status)",
+    """
+    CREATE TABLE chat_sessions (
+        id uuid NOT NULL,
+        child_id uuid NOT NULL CONSTRAINT chat_sessions_child_id_fkey REFERENCES children(id) ON DELETE CASCADE,
+        domain_id uuid CONSTRAINT chat_sessions_domain_id_fkey REFERENCES domains(id) ON DELETE SET NULL,
+        started_at timestamp without time zone,
+        ended_at timestamp without time zone,
+        message_count integer,
+        CONSTRAINT chat_sessions_pkey PRIMARY KEY (id, child_id)
+    ) PARTITION BY HASH (child_id)
+    """,
+    """
+    CREATE TABLE chat_messages (
+        id uuid NOT NULL,
+        session_id uuid NOT NULL,
+        child_id uuid NOT NULL,
+        role varchar(20) NOT NULL,
+        content text NOT NULL,
+        word_id uuid CONSTRAINT chat_messages_word_id_fkey REFERENCES words(id) ON DELETE SET NULL,
+        created_at timestamp without time zone,
+        CONSTRAINT chat_messages_pkey PRIMARY KEY (id, child_id),
+        CONSTRAINT chat_messages_session_id_child_id_fkey FOREIGN KEY (session_id, child_id)
+            REFERENCES chat_sessions (id, child_id) ON DELETE CASCADE
+    ) PARTITION BY HASH (child_id)
+    """,
+    "CREATE INDEX ix_chat_messages_session_created ON chat_messages (session_id, created_at)",
+)
+
+_PROGRESS_COLUMNS = (
+    "id, child_id, word_id, status, attempts, correct_count, streak_count, "
+    "last_practiced_at, unlocked_at, mastered_at, created_at, updated_at"
+)
+_SESSION_COLUMNS = "id, child_id, domain_id, started_at, ended_at, message_count"
+
+_COPY_ROWS = (
+    f"INSERT INTO progress ({_PROGRESS_COLUMNS}) SELECT {_PROGRESS_COLUMNS} FROM progress_unpartitioned",
+    f"INSERT INTO chat_sessions ({_SESSION_COLUMNS}) SELECT {_SESSION_COLUMNS} FROM chat_sessions_unpartitioned",
+    """
+    INSERT INTO chat_messages (id, session_id, child_id, role, content, word_id, created_at)
+    SELECT m.id, m.session_id, s.child_id, m.role, m.content, m.word_id, m.created_at
+    FROM chat_messages_unpartitioned m
+    JOIN chat_sessions_unpartitioned s ON s.id = m.session_id
+    """,
+)
+
+_CREATE_PLAIN = (
+    """
+    CREATE TABLE progress (
+        id uuid PRIMARY KEY,
+        child_id uuid NOT NULL CONSTRAINT progress_child_id_fkey REFERENCES children(id) ON DELETE CASCADE,
+        word_id uuid NOT NULL CONSTRAINT progress_word_id_fkey REFERENCES words(id) ON DELETE CASCADE,
+        status progressstatus NOT NULL,
+        attempts integer,
+        correct_count integer,
+        streak_count integer,
+        last_practiced_at timestamp without time zone,
+        unlocked_at timestamp without time zone,
+        mastered_at timestamp without time zone,
+        created_at timestamp without time zone,
+        updated_at timestamp without time zone,
+        CONSTRAINT uq_child_word UNIQUE (child_id, word_id)
+    )
+    """,
+    "CREATE INDEX ix_progress_child_status ON progress (child_id, status)",
+    """
+    CREATE TABLE chat_sessions (
+        id uuid PRIMARY KEY,
+        child_id uuid NOT NULL CONSTRAINT chat_sessions_child_id_fkey REFERENCES children(id) ON DELETE CASCADE,
+        domain_id uuid CONSTRAINT chat_sessions_domain_id_fkey REFERENCES domains(id) ON DELETE SET NULL,
+        started_at timestamp without time zone,
+        ended_at timestamp without time zone,
+        message_count integer
+    )
+    """,
+    """
+    CREATE TABLE chat_messages (
+        id uuid PRIMARY KEY,
+        session_id uuid NOT NULL CONSTRAINT chat_messages_session_id_fkey REFERENCES chat_sessions(id) ON DELETE CASCADE,
+        role varchar(20) NOT NULL,
+        content text NOT NULL,
+        word_id uuid CONSTRAINT chat_messages_word_id_fkey REFERENCES words(id) ON DELETE SET NULL,
+        created_at timestamp without time zone
+    )
+    """,
+)
+
+_COPY_ROWS_BACK = (
+    f"INSERT INTO progress ({_PROGRESS_COLUMNS}) SELECT {_PROGRESS_COLUMNS} FROM progress_partitioned",
+    f"INSERT INTO chat_sessions ({_SESSION_COLUMNS}) SELECT {_SESSION_COLUMNS} FROM chat_sessions_partitioned",
+    """
+    INSERT INTO chat_messages (id, session_id, role, content, word_id, created_at)
+    SELECT id, session_id, role, content, word_id, created_at FROM chat_messages_partitioned
+    """,
+)
+
+
+def _relkind(table: str) -> Optional[str]:
+    """'r' for a plain table, 'p' for a partitioned one, None if missing."""
+    return op.get_bind().execute(
+        sa.text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table}
+    ).scalar()
+
+
+def _all_tables_are(relkind: str) -> bool:
+    """Whether every per-child table exists and has the given kind."""
+    return all(_relkind(table) == relkind for table in CHILD_PARTITIONED_TABLES)
+
+
+def _set_aside(suffix: str) -> None:
+    """Rename the current tables, their partitions and indexes out of the way."""
+    bind = op.get_bind()
+    for table in CHILD_PARTITIONED_TABLES:
+        partitions = bind.execute(
+            sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table)"),
+            {"table": table}
+        ).scalars().all()
+        indexes = bind.execute(
+            sa.text(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = ANY(:tables)"
+            ),
+            {"tables": [table, *partitions]}
+        ).scalars().all()
+        for index in indexes:
+            op.execute(f'ALTER INDEX "{index}" RENAME TO "{index}_{suffix}"')
+        for partition in partitions:
+            op.execute(f'ALTER TABLE "{partition}" RENAME TO "{partition}_{suffix}"')
+        op.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_{suffix}"')
+
+
+def _drop_set_aside(suffix: str) -> None:
+    # Children first, so no foreign key is left pointing at a dropped table
+    for table in reversed(CHILD_PARTITIONED_TABLES):
+        op.execute(f'DROP TABLE "{table}_{suffix}"')
+
+
+def upgrade() -> None:
+    if not _all_tables_are("r"):
+        return
+    _set_aside("unpartitioned")
+    for statement in _CREATE_PARTITIONED:
+        op.execute(statement)
+    partitions = get_settings().child_partition_count
+    for table in CHILD_PARTITIONED_TABLES:
+        for statement in hash_partition_ddl(table, partitions):
+            op.execute(statement)
+    for statement in _COPY_ROWS:
+        op.execute(statement)
+    _drop_set_aside("unpartitioned")
+    for table in CHILD_PARTITIONED_TABLES:
+        op.execute(f'ANALYZE "{table}"')
+
+
+def downgrade() -> None:
+    if not _all_tables_are("p"):
+        return
+    # The partitions are dropped with their parents
+    _set_aside("partitioned")
+    for statement in _CREATE_PLAIN:
+        op.execute(statement)
+    for statement in _COPY_ROWS_BACK:
+        op.execute(statement)
+    _drop_set_aside("partitioned")
@@ -0,0 +1,59 @@
+"""Build word_prerequisite_closure
+
+Revision ID: c4e9a1f3b7d8
+Revises: 7b1d4e6a9c02
+Create Date: 2026-10-19 05:00:00
+
+Creates the closure table if it is missing and recomputes every row from
+word_prerequisites under the closure lock, so edge writes made before the
+table existed are covered. This runs before the app serves requests
+against the new schema; the app no longer builds the closure itself.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# The statements rebuild_prerequisite_closure runs, for a sync connection
+from app.services.prerequisite_service import _CLOSURE_LOCK, _RECOMPUTE_SQL
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e9a1f3b7d8"
+down_revision: Union[str, None] = "7b1d4e6a9c02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(table: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if not _has_table("word_prerequisites"):
+        return
+    if not _has_table("word_prerequisite_closure"):
+        op.create_table(
+            "word_prerequisite_closure",
+            sa.Column("ancestor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("words.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("descendant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("words.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("distance", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+        )
+        op.create_index(
+            "ix_word_prerequisite_closure_descendant",
+            "word_prerequisite_closure",
+            ["descendant_id", "distance"],
+        )
+
+    bind = op.get_bind()
+    bind.execute(_CLOSURE_LOCK)
+    bind.execute(sa.text("DELETE FROM word_prerequisite_closure"))
+    word_ids = bind.execute(sa.text("SELECT DISTINCT word_id FROM word_prerequisites")).scalars().all()
+    bind.execute(_RECOMPUTE_SQL, {"word_ids": list(word_ids)})
+    op.execute("ANALYZE word_prerequisite_closure")
+
+
+def downgrade() -> None:
+    # The closure is derived from word_prerequisites; leaving it is harmless
+    pass
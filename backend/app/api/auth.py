@@ -1,6 +1,7 @@
 import uuid
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import EmailStr
@@ -8,9 +9,10 @@ from pydantic import EmailStr
 from app.database import get_db
 from app.models.user import User
 from app.models.progress import Child
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import verify_password, get_password_hash, create_access_token, decode_access_token
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, ChildCreate, ChildResponse
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, limit_writes, security
+from app.services.auth_service import revoke_access_token
 from app.config import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -63,13 +65,32 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     return Token(access_token=access_token)
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Revoke the access token used for this request."""
+    payload = decode_access_token(credentials.credentials)
+    await revoke_access_token(db, credentials.credentials, payload)
+    await db.commit()
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user info."""
     return current_user
 
 
-@router.post("/children", response_model=ChildResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/children",
+    response_model=ChildResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_writes)]
+)
 async def create_child(
     child_data: ChildCreate,
     current_user: User = Depends(get_current_user),
@@ -1,6 +1,7 @@
 import uuid
 import random
 from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,7 +13,8 @@ from app.models.progress import Child
 from app.models.chat import ChatSession, ChatMessage
 from app.models.word import Word
 from app.schemas.chat import ChatRequest, ChatResponse
-from app.dependencies import get_current_user
+from app.services.idempotency_service import IdempotentRequest, claim_idempotency_key, store_idempotent_response
+from app.dependencies import get_current_user, get_idempotency_key, limit_writes
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
@@ -58,13 +60,23 @@ class ChatService:
         return random.choice(cls.RESPONSES["default"])
 
 
-@router.post("/message", response_model=ChatResponse)
+@router.post("/message", response_model=ChatResponse, dependencies=[Depends(limit_writes)])
 async def send_message(
     chat_data: ChatRequest,
+    idempotency: Optional[IdempotentRequest] = Depends(get_idempotency_key),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Send a message and get AI response."""
+    """Send a message and get AI response.
+
+    With an ``Idempotency-Key`` header, a retry returns the first reply
+    instead of storing the messages again.
+    """
+    if idempotency:
+        replay = await claim_idempotency_key(db, current_user.id, idempotency)
+        if replay is not None:
+            return replay
+
     # Verify child
     child_result = await db.execute(
         select(Child).where(Child.id == chat_data.child_id, Child.user_id == current_user.id)
@@ -103,6 +115,7 @@ async def send_message(
     # Create user message
     user_message = ChatMessage(
         session_id=session.id,
+        child_id=session.child_id,
         role="user",
         content=chat_data.message,
         word_id=None
@@ -118,6 +131,7 @@ async def send_message(
     # Create assistant message
     assistant_message = ChatMessage(
         session_id=session.id,
+        child_id=session.child_id,
         role="assistant",
         content=ai_response_text,
         word_id=None
@@ -126,11 +140,9 @@ async def send_message(
 
     # Update session
     session.message_count += 2
+    await db.flush()
 
-    await db.commit()
-    await db.refresh(assistant_message)
-
-    return ChatResponse(
+    response = ChatResponse(
         session_id=session.id,
         message={
             "role": "assistant",
@@ -139,6 +151,11 @@ async def send_message(
             "timestamp": assistant_message.created_at
         }
     )
+    if idempotency:
+        await store_idempotent_response(db, current_user.id, idempotency, response)
+
+    await db.commit()
+    return response
 
 
 @router.get("/sessions/{session_id}/history")
@@ -169,7 +186,7 @@ async def get_chat_history(
     # Get messages
     messages_result = await db.execute(
         select(ChatMessage)
-        .where(ChatMessage.session_id == session_id)
+        .where(ChatMessage.session_id == session_id, ChatMessage.child_id == session.child_id)
         .order_by(ChatMessage.created_at)
     )
     messages = messages_result.scalars().all()
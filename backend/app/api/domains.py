@@ -1,6 +1,8 @@
+import json
 import uuid
+from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -8,9 +10,16 @@ from sqlalchemy.orm import selectinload
 from app.database import get_db
 from app.models.user import User
 from app.models.domain import Domain
+from app.models.progress import Child
 from app.models.word import Word, WordTranslation, WordPrerequisite
-from app.schemas.domain import DomainCreate, DomainResponse, DomainUpdate, WordCreate, WordResponse
-from app.dependencies import get_current_user
+from app.schemas.domain import DomainCreate, DomainResponse, DomainUpdate, WordCreate, WordResponse, DomainChangesResponse, WordBatchUpdate, WordBatchDelete, WordBatchResult
+from app.dependencies import get_current_user, limit_writes
+from app.services.content_service import mark_domain_changed, get_domain_changes, update_words, delete_words, clone_domain
+from app.services.language_service import parse_languages
+from app.services.graph_service import render_domain_words, render_domain_graph, build_words_payload, build_graph_payload, get_domain_subgraph, render_child_graph
+from app.services.system_content_service import get_system_snapshot
+from app.services.layout_service import get_domain_layout, get_snapshot_layout
+from app.services.prerequisite_service import accessible_word_ids, add_prerequisites, PrerequisiteCycleError
 
 router = APIRouter(prefix="/domains", tags=["Domains"])
 
@@ -55,7 +64,12 @@ async def list_domains(
     return response
 
 
-@router.post("", response_model=DomainResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=DomainResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_writes)]
+)
 async def create_domain(
     domain_data: DomainCreate,
     current_user: User = Depends(get_current_user),
@@ -88,6 +102,60 @@ async def create_domain(
     )
 
 
+@router.post(
+    "/{domain_id}/clone",
+    response_model=DomainResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_writes)]
+)
+async def clone_domain_endpoint(
+    domain_id: uuid.UUID,
+    overrides: Optional[DomainUpdate] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Copy a system or own domain into a new custom domain.
+
+    Fields given in the body replace those of the source domain.
+    """
+    result = await db.execute(
+        select(Domain).where(
+            (Domain.id == domain_id) &
+            ((Domain.user_id == current_user.id) | (Domain.is_system == True))
+        )
+    )
+    source = result.scalar_one_or_none()
+
+    if not source:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Domain not found"
+        )
+
+    overrides = overrides or DomainUpdate()
+    new_domain, word_count = await clone_domain(
+        db, source, current_user.id,
+        name=overrides.name,
+        description=overrides.description,
+        icon=overrides.icon,
+        color=overrides.color
+    )
+    await db.commit()
+    await db.refresh(new_domain)
+
+    return DomainResponse(
+        id=new_domain.id,
+        user_id=new_domain.user_id,
+        name=new_domain.name,
+        description=new_domain.description,
+        icon=new_domain.icon,
+        color=new_domain.color,
+        is_system=new_domain.is_system,
+        word_count=word_count,
+        created_at=new_domain.created_at
+    )
+
+
 @router.get("/{domain_id}", response_model=DomainResponse)
 async def get_domain(
     domain_id: uuid.UUID,
@@ -95,6 +163,22 @@ async def get_domain(
     db: AsyncSession = Depends(get_db)
 ):
     """Get domain details."""
+    # System domains are served from the shared snapshot without a DB round trip
+    snapshot = get_system_snapshot()
+    if snapshot is not None and snapshot.has_domain(domain_id):
+        system_domain = snapshot.domain(domain_id)
+        return DomainResponse(
+            id=system_domain.id,
+            user_id=None,
+            name=system_domain.name,
+            description=system_domain.description,
+            icon=system_domain.icon,
+            color=system_domain.color,
+            is_system=True,
+            word_count=system_domain.word_count,
+            created_at=system_domain.created_at
+        )
+
     result = await db.execute(
         select(Domain).where(
             (Domain.id == domain_id) &
@@ -127,7 +211,12 @@ async def get_domain(
     )
 
 
-@router.post("/{domain_id}/words", response_model=WordResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{domain_id}/words",
+    response_model=WordResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_writes)]
+)
 async def create_word(
     domain_id: uuid.UUID,
     word_data: WordCreate,
@@ -135,19 +224,15 @@ async def create_word(
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new word in a domain."""
-    # Verify domain exists and user has access
-    domain_result = await db.execute(
-        select(Domain).where(
-            (Domain.id == domain_id) &
-            ((Domain.user_id == current_user.id) | (Domain.is_system == True))
-        )
-    )
-    domain = domain_result.scalar_one_or_none()
+    await _get_writable_domain(db, domain_id, current_user)
 
-    if not domain:
+    # Prerequisites must be existing words the user can read
+    prerequisite_ids = list(dict.fromkeys(word_data.prerequisite_ids))
+    unknown = set(prerequisite_ids) - await accessible_word_ids(db, prerequisite_ids, current_user.id)
+    if unknown:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Domain not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown prerequisite words: {', '.join(sorted(str(i) for i in unknown))}"
         )
 
     # Create word
@@ -171,14 +256,17 @@ async def create_word(
         )
         db.add(translation)
 
-    # Create prerequisites
-    for prereq_id in word_data.prerequisite_ids:
-        prerequisite = WordPrerequisite(
-            word_id=new_word.id,
-            prerequisite_id=prereq_id
+    # Create prerequisites, keeping the closure table in step
+    try:
+        await add_prerequisites(db, [(new_word.id, prereq_id) for prereq_id in prerequisite_ids])
+    except PrerequisiteCycleError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc)
         )
-        db.add(prerequisite)
 
+    await mark_domain_changed(db, domain_id)
     await db.commit()
     await db.refresh(new_word)
 
@@ -217,18 +305,12 @@ async def create_word(
     )
 
 
-@router.get("/{domain_id}/words")
-async def list_domain_words(
-    domain_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get all words in a domain."""
-    # Verify domain access
+async def _get_writable_domain(db: AsyncSession, domain_id: uuid.UUID, user: User) -> Domain:
+    """The domain if the user owns it; system domains are read-only."""
     domain_result = await db.execute(
         select(Domain).where(
             (Domain.id == domain_id) &
-            ((Domain.user_id == current_user.id) | (Domain.is_system == True))
+            ((Domain.user_id == user.id) | (Domain.is_system == True))
         )
     )
     domain = domain_result.scalar_one_or_none()
@@ -238,59 +320,126 @@ async def list_domain_words(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Domain not found"
         )
+    if domain.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="System domains cannot be edited"
+        )
+    return domain
+
 
+async def _check_domain_words(db: AsyncSession, domain_id: uuid.UUID, word_ids: list[uuid.UUID]) -> None:
+    if len(set(word_ids)) != len(word_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each word may appear only once per batch"
+        )
     result = await db.execute(
-        select(Word)
-        .options(selectinload(Word.translations))
-        .where(Word.domain_id == domain_id)
-        .order_by(Word.sort_order)
+        select(Word.id).where(Word.id.in_(word_ids), Word.domain_id == domain_id)
     )
-    words = result.scalars().all()
+    unknown = set(word_ids) - set(result.scalars().all())
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown words in this domain: {', '.join(sorted(str(i) for i in unknown))}"
+        )
 
-    # Get prerequisite IDs for each word
-    word_ids = [w.id for w in words]
-    prereq_result = await db.execute(
-        select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
-        .where(WordPrerequisite.word_id.in_(word_ids))
+
+async def _batch_result(db: AsyncSession, domain_id: uuid.UUID, word_count: int) -> WordBatchResult:
+    version_result = await db.execute(select(Domain.content_version).where(Domain.id == domain_id))
+    return WordBatchResult(
+        domain_id=domain_id,
+        content_version=version_result.scalar_one(),
+        word_count=word_count
     )
-    prereq_map = {}
-    for word_id, prereq_id in prereq_result.all():
-        if word_id not in prereq_map:
-            prereq_map[word_id] = []
-        prereq_map[word_id].append(prereq_id)
-
-    return [
-        {
-            "id": w.id,
-            "domain_id": w.domain_id,
-            "difficulty": w.difficulty,
-            "image_url": w.image_url,
-            "sort_order": w.sort_order,
-            "translations": [
-                {
-                    "id": t.id,
-                    "language": t.language,
-                    "text": t.text,
-                    "phonetic": t.phonetic,
-                    "example_sentence": t.example_sentence
-                }
-                for t in w.translations
-            ],
-            "prerequisite_ids": prereq_map.get(w.id, []),
-            "created_at": w.created_at
-        }
-        for w in words
-    ]
 
 
-@router.get("/{domain_id}/graph")
-async def get_domain_graph(
+@router.patch("/{domain_id}/words", response_model=WordBatchResult, dependencies=[Depends(limit_writes)])
+async def update_domain_words(
+    domain_id: uuid.UUID,
+    batch: WordBatchUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update many words of a domain in one transaction."""
+    await _get_writable_domain(db, domain_id, current_user)
+    await _check_domain_words(db, domain_id, [item.id for item in batch.words])
+
+    prerequisite_ids = list({p for item in batch.words for p in item.add_prerequisite_ids})
+    unknown = set(prerequisite_ids) - await accessible_word_ids(db, prerequisite_ids, current_user.id)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown prerequisite words: {', '.join(sorted(str(i) for i in unknown))}"
+        )
+
+    try:
+        await update_words(db, domain_id, batch.words)
+    except PrerequisiteCycleError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc)
+        )
+    await db.commit()
+
+    return await _batch_result(db, domain_id, len(batch.words))
+
+
+@router.delete("/{domain_id}/words", response_model=WordBatchResult, dependencies=[Depends(limit_writes)])
+async def delete_domain_words(
+    domain_id: uuid.UUID,
+    batch: WordBatchDelete,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete many words of a domain in one transaction."""
+    await _get_writable_domain(db, domain_id, current_user)
+    await _check_domain_words(db, domain_id, batch.word_ids)
+
+    await delete_words(db, domain_id, batch.word_ids)
+    await db.commit()
+
+    return await _batch_result(db, domain_id, len(batch.word_ids))
+
+
+@router.get("/{domain_id}/words")
+async def list_domain_words(
+    domain_id: uuid.UUID,
+    lang: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get all words in a domain."""
+    snapshot = get_system_snapshot()
+    if snapshot is not None and snapshot.has_domain(domain_id):
+        words, edges = snapshot.words(domain_id)
+        return build_words_payload(words, edges, parse_languages(lang))
+
+    # Rendered as JSON by Postgres, with the access check in the same statement
+    payload = await render_domain_words(db, domain_id, current_user.id, parse_languages(lang))
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Domain not found"
+        )
+
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/{domain_id}/changes", response_model=DomainChangesResponse)
+async def get_domain_content_changes(
     domain_id: uuid.UUID,
+    since: Optional[datetime] = None,
+    version: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get learning graph for a domain."""
-    # Verify domain access
+    """Get words, translations and edges changed since a sync cursor.
+
+    Devices send the cursor and content version from their previous sync.
+    When the version is unchanged nothing is read beyond the domain row.
+    """
     domain_result = await db.execute(
         select(Domain).where(
             (Domain.id == domain_id) &
@@ -305,66 +454,110 @@ async def get_domain_graph(
             detail="Domain not found"
         )
 
-    # Get words with translations
-    result = await db.execute(
-        select(Word)
-        .options(selectinload(Word.translations))
-        .where(Word.domain_id == domain_id)
-        .order_by(Word.sort_order)
-    )
-    words = result.scalars().all()
+    if since is not None and version == domain.content_version:
+        return DomainChangesResponse(
+            domain_id=domain.id,
+            content_version=domain.content_version,
+            cursor=datetime.utcnow()
+        )
 
-    # Get all prerequisite relationships
-    word_ids = [w.id for w in words]
-    prereq_result = await db.execute(
-        select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
-        .where(WordPrerequisite.word_id.in_(word_ids))
-    )
-    edges = [
-        {"from": str(prereq_id), "to": str(word_id)}
-        for word_id, prereq_id in prereq_result.all()
-    ]
-
-    # Build nodes
-    nodes = []
-    for w in words:
-        translations_dict = {t.language: t.text for t in w.translations}
-        nodes.append({
-            "id": str(w.id),
-            "domain_id": str(w.domain_id),
-            "difficulty": w.difficulty,
-            "image_url": w.image_url,
-            "translations": translations_dict,
-            "sort_order": w.sort_order
-        })
-
-    # Compute depth levels (topological sort approximation)
-    depth_map = {}
-    for w in words:
-        depth_map[w.id] = 0
-
-    # Simple BFS to compute depths
-    changed = True
-    iterations = 0
-    while changed and iterations < len(word_ids) + 1:
-        changed = False
-        iterations += 1
-        for word_id, prereq_id in prereq_result.all():
-            if depth_map.get(prereq_id, 0) + 1 > depth_map.get(word_id, 0):
-                depth_map[word_id] = depth_map.get(prereq_id, 0) + 1
-                changed = True
-
-    # Group by depth
-    levels = {}
-    for word_id, depth in depth_map.items():
-        if depth not in levels:
-            levels[depth] = []
-        levels[depth].append(str(word_id))
-
-    return {
-        "domain_id": str(domain.id),
-        "domain_name": domain.name,
-        "nodes": nodes,
-        "edges": edges,
-        "levels": [levels.get(d, []) for d in range(max(levels.keys()) + 1) if levels]
-    }
+    return await get_domain_changes(db, domain, since)
+
+
+@router.get("/{domain_id}/graph")
+async def get_domain_graph(
+    domain_id: uuid.UUID,
+    lang: Optional[str] = None,
+    layout: bool = False,
+    center_word_id: Optional[uuid.UUID] = None,
+    hops: int = Query(2, ge=1, le=10),
+    min_level: Optional[int] = Query(None, ge=0),
+    max_level: Optional[int] = Query(None, ge=0),
+    max_nodes: Optional[int] = Query(None, ge=1, le=5000),
+    child_id: Optional[uuid.UUID] = None,
+    level_counts: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get learning graph for a domain.
+
+    With ``layout=true`` the response also has precomputed node ``positions``.
+    ``center_word_id``/``hops``, ``min_level``/``max_level`` and ``max_nodes``
+    return only part of the graph, for domains too large to load at once.
+    With ``child_id`` every node carries that child's progress.
+    """
+    languages = parse_languages(lang)
+    if child_id is not None:
+        child_result = await db.execute(
+            select(Child).where(Child.id == child_id, Child.user_id == current_user.id)
+        )
+        child = child_result.scalar_one_or_none()
+
+        if not child:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Child not found"
+            )
+        languages = parse_languages(lang, default=child.preferred_language)
+
+    if center_word_id is not None or min_level is not None or max_level is not None or max_nodes is not None:
+        domain_result = await db.execute(
+            select(Domain).where(
+                (Domain.id == domain_id) &
+                ((Domain.user_id == current_user.id) | (Domain.is_system == True))
+            )
+        )
+        domain = domain_result.scalar_one_or_none()
+
+        if not domain:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Domain not found"
+            )
+
+        graph = await get_domain_subgraph(
+            db, domain, languages, center_word_id, hops, min_level, max_level, max_nodes,
+            child_id, level_counts
+        )
+        if graph is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Word not found"
+            )
+        if layout:
+            positions = await get_domain_layout(db, domain_id, current_user.id, domain.content_version)
+            # A word added since the domain was read has no place yet; the client grids it
+            graph["positions"] = {
+                node["id"]: positions[node["id"]] for node in graph["nodes"] if node["id"] in positions
+            }
+        return graph
+
+    snapshot = get_system_snapshot()
+    if child_id is None and snapshot is not None and snapshot.has_domain(domain_id):
+        domain = snapshot.domain(domain_id)
+        words, edges = snapshot.words(domain_id)
+        graph = build_graph_payload(
+            domain_id, words, edges, languages, {w.id: w.level for w in words}
+        )
+        graph["domain_name"] = domain.name
+        if layout:
+            graph["positions"] = await get_snapshot_layout(domain, words, edges)
+        return graph
+
+    # Rendered as JSON by Postgres, with the access check in the same statement
+    if child_id is not None:
+        payload = await render_child_graph(db, domain_id, current_user.id, child_id, languages, level_counts)
+    else:
+        payload = await render_domain_graph(db, domain_id, current_user.id, languages)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Domain not found"
+        )
+
+    if layout:
+        positions = await get_domain_layout(db, domain_id, current_user.id)
+        # Splice the positions into the rendered object instead of decoding it
+        payload = payload[:-1] + b',"positions":' + json.dumps(positions).encode() + b"}"
+
+    return Response(content=payload, media_type="application/json")
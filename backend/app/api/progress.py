@@ -1,21 +1,66 @@
 import uuid
 from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, and_
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select, and_, or_, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, aliased
 
 from app.database import get_db
+from app.core.constants import ProgressStatus, LEARNABLE_STATUSES
 from app.models.user import User
 from app.models.progress import Child, Progress
+from app.models.domain import Domain
 from app.models.word import Word, WordTranslation, WordPrerequisite
-from app.schemas.progress import ProgressResponse, ProgressAttempt, DomainProgressResponse, NextWordsResponse, WordProgressResponse
-from app.dependencies import get_current_user
+from app.schemas.progress import ProgressResponse, ProgressAttempt, DomainProgressResponse, NextWordsResponse, WordProgressResponse, ProgressSnapshotResponse, ChildOverviewResponse, ActivityResponse, LearningPathResponse, LearningPathStep
+from app.dependencies import get_current_user, get_idempotency_key, limit_writes, shed_when_busy
+from app.services.progress_service import (
+    build_progress_snapshot,
+    lock_progress,
+    unlock_dependents,
+    get_children_overview,
+    record_daily_activity,
+    get_daily_activity,
+    get_current_streak,
+    append_attempt_events,
+)
+from app.services.learning_path_service import (
+    WordState,
+    get_learning_plan,
+    plan_steps,
+    publish_learning_path_change,
+    apply_attempt,
+)
+from app.services.idempotency_service import IdempotentRequest, claim_idempotency_key, store_idempotent_response
+from app.services.language_service import parse_languages, translations_loader, project_translations, load_translations
 
 router = APIRouter(prefix="/progress", tags=["Progress"])
 
 
+async def _verify_domain_readable(db: AsyncSession, domain_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    """404 unless the domain is a system domain or belongs to the user."""
+    domain_result = await db.execute(
+        select(Domain.id).where(
+            (Domain.id == domain_id) &
+            ((Domain.user_id == user_id) | (Domain.is_system == True))
+        )
+    )
+    if domain_result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Domain not found"
+        )
+
+
+@router.get("/children/overview", response_model=list[ChildOverviewResponse], dependencies=[Depends(shed_when_busy)])
+async def get_children_progress_overview(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get overview statistics for every child of the current user."""
+    return await get_children_overview(db, current_user.id)
+
+
 @router.get("/child/{child_id}", response_model=list[ProgressResponse])
 async def get_child_progress(
     child_id: uuid.UUID,
@@ -62,7 +107,40 @@ async def get_child_progress(
     ]
 
 
-@router.get("/child/{child_id}/overview")
+@router.get("/child/{child_id}/snapshot", response_model=ProgressSnapshotResponse)
+async def get_progress_snapshot(
+    child_id: uuid.UUID,
+    domain_id: uuid.UUID,
+    counters: bool = False,
+    words_digest: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a compact, packed snapshot of a child's progress in a domain."""
+    # Verify child belongs to user
+    child_result = await db.execute(
+        select(Child).where(Child.id == child_id, Child.user_id == current_user.id)
+    )
+    child = child_result.scalar_one_or_none()
+
+    if not child:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child not found"
+        )
+
+    await _verify_domain_readable(db, domain_id, current_user.id)
+
+    return await build_progress_snapshot(
+        db,
+        child_id,
+        domain_id,
+        include_counters=counters,
+        known_words_digest=words_digest
+    )
+
+
+@router.get("/child/{child_id}/overview", dependencies=[Depends(shed_when_busy)])
 async def get_progress_overview(
     child_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
@@ -103,11 +181,40 @@ async def get_progress_overview(
     return stats
 
 
+@router.get("/child/{child_id}/activity", response_model=ActivityResponse, dependencies=[Depends(shed_when_busy)])
+async def get_child_activity(
+    child_id: uuid.UUID,
+    days: int = Query(90, ge=1, le=366),
+    domain_id: Optional[uuid.UUID] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get words practiced per day and the current day streak for a child."""
+    # Verify child
+    child_result = await db.execute(
+        select(Child).where(Child.id == child_id, Child.user_id == current_user.id)
+    )
+    child = child_result.scalar_one_or_none()
+
+    if not child:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child not found"
+        )
+
+    return ActivityResponse(
+        child_id=child_id,
+        current_streak=await get_current_streak(db, child_id),
+        days=await get_daily_activity(db, child_id, days, domain_id)
+    )
+
+
 @router.get("/child/{child_id}/next-words", response_model=NextWordsResponse)
 async def get_next_words(
     child_id: uuid.UUID,
     domain_id: uuid.UUID,
     limit: int = 5,
+    lang: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -124,90 +231,158 @@ async def get_next_words(
             detail="Child not found"
         )
 
-    # Get all words in domain with translations
-    words_result = await db.execute(
-        select(Word)
-        .options(selectinload(Word.translations))
-        .where(Word.domain_id == domain_id, Word.is_active == True)
+    # Words the child can learn now: unlocked or started progress rows, plus
+    # locked or untouched words whose prerequisites are all mastered. The
+    # second case covers roots and words that record_attempt never unlocked:
+    # ones created or rewired after their prerequisites were mastered.
+    prereq_progress = aliased(Progress)
+    has_unmastered_prerequisite = (
+        select(WordPrerequisite.id)
+        .outerjoin(
+            prereq_progress,
+            and_(
+                prereq_progress.word_id == WordPrerequisite.prerequisite_id,
+                prereq_progress.child_id == child_id,
+                prereq_progress.status == ProgressStatus.MASTERED
+            )
+        )
+        .where(WordPrerequisite.word_id == Word.id, prereq_progress.id.is_(None))
+        .exists()
     )
-    words = words_result.scalars().all()
-
-    # Get current progress for child
-    progress_result = await db.execute(
-        select(Progress).where(Progress.child_id == child_id)
+    unlock_count = (
+        select(func.count())
+        .select_from(WordPrerequisite)
+        .where(WordPrerequisite.prerequisite_id == Word.id)
+        .scalar_subquery()
     )
-    progress_records = progress_result.scalars().all()
-
-    # Build mastered set and progress map
-    mastered = set()
-    progress_map = {}
-    for p in progress_records:
-        progress_map[p.word_id] = p
-        if p.status == "mastered":
-            mastered.add(p.word_id)
-
-    # Get all prerequisites
-    word_ids = [w.id for w in words]
-    prereq_result = await db.execute(
-        select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
-        .where(WordPrerequisite.word_id.in_(word_ids))
+    difficulty_score = case(
+        {"beginner": 100, "intermediate": 50, "advanced": 10},
+        value=Word.difficulty,
+        else_=0
+    )
+
+    # Priority: easier words first, with a bonus for unlocking many words
+    languages = parse_languages(lang, default=child.preferred_language)
+    candidates_result = await db.execute(
+        select(Word, Progress.status)
+        .options(translations_loader(languages))
+        .outerjoin(
+            Progress,
+            and_(Progress.word_id == Word.id, Progress.child_id == child_id)
+        )
+        .where(
+            Word.domain_id == domain_id,
+            Word.is_active == True,
+            or_(
+                Progress.status.in_(LEARNABLE_STATUSES),
+                and_(
+                    or_(Progress.id.is_(None), Progress.status == ProgressStatus.LOCKED),
+                    ~has_unmastered_prerequisite
+                )
+            )
+        )
+        .order_by((difficulty_score + unlock_count * 10).desc(), Word.sort_order)
+        .limit(limit)
     )
-    prereq_map = {}
-    for word_id, prereq_id in prereq_result.all():
-        if word_id not in prereq_map:
-            prereq_map[word_id] = []
-        prereq_map[word_id].append(prereq_id)
-
-    # Find unlocked words (prerequisites met, not mastered)
-    candidates = []
-    for word in words:
-        if word.id in mastered:
-            continue
-
-        # Check if prerequisites are met
-        prereqs = prereq_map.get(word.id, [])
-        if all(p in mastered for p in prereqs):
-            # Calculate priority score
-            difficulty_score = {"beginner": 100, "intermediate": 50, "advanced": 10}
-            score = difficulty_score.get(word.difficulty, 0)
-
-            # Bonus for unlocking many words
-            unlock_count = sum(1 for wid, pr in prereq_map.items() if word.id in pr)
-            score += unlock_count * 10
-
-            candidates.append((word, score))
-
-    # Sort by score and limit
-    candidates.sort(key=lambda x: x[1], reverse=True)
-    selected_words = candidates[:limit]
 
     # Build response
     response_words = []
-    for word, _ in selected_words:
-        progress = progress_map.get(word.id)
-        status = progress.status if progress else "unlocked"
-
-        translations_dict = {t.language: t.text for t in word.translations}
+    for word, progress_status in candidates_result.all():
+        translations_dict = {
+            t.language: t.text for t in project_translations(word.translations, languages)
+        }
 
         response_words.append(WordProgressResponse(
             word_id=word.id,
             word_text=translations_dict,
-            status=status,
+            status=progress_status if progress_status in LEARNABLE_STATUSES else ProgressStatus.UNLOCKED,
             difficulty=word.difficulty
         ))
 
     return NextWordsResponse(words=response_words)
 
 
-@router.post("/child/{child_id}/word/{word_id}/attempt", response_model=ProgressResponse)
+@router.get("/child/{child_id}/learning-path", response_model=LearningPathResponse)
+async def get_learning_path(
+    child_id: uuid.UUID,
+    domain_id: uuid.UUID,
+    target_word_id: Optional[uuid.UUID] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    lang: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the full ordered study sequence of a child in a domain.
+
+    With ``target_word_id`` only the steps leading to that word are returned.
+    """
+    child_result = await db.execute(
+        select(Child).where(Child.id == child_id, Child.user_id == current_user.id)
+    )
+    child = child_result.scalar_one_or_none()
+
+    if not child:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child not found"
+        )
+
+    await _verify_domain_readable(db, domain_id, current_user.id)
+
+    plan = await get_learning_plan(db, child_id, domain_id)
+    if target_word_id is not None and target_word_id not in plan.graph.difficulty:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Word not found"
+        )
+
+    steps = plan_steps(plan, target_word_id)
+    shown = steps[:limit] if limit is not None else steps
+
+    languages = parse_languages(lang, default=child.preferred_language)
+    translations = await load_translations(db, [s["word_id"] for s in shown], languages)
+
+    return LearningPathResponse(
+        child_id=child_id,
+        domain_id=domain_id,
+        target_word_id=target_word_id,
+        total_steps=len(steps),
+        steps=[
+            LearningPathStep(
+                **s,
+                word_text={
+                    t.language: t.text
+                    for t in project_translations(translations.get(s["word_id"], []), languages)
+                }
+            )
+            for s in shown
+        ]
+    )
+
+
+@router.post(
+    "/child/{child_id}/word/{word_id}/attempt",
+    response_model=ProgressResponse,
+    dependencies=[Depends(limit_writes)]
+)
 async def record_attempt(
     child_id: uuid.UUID,
     word_id: uuid.UUID,
     attempt_data: ProgressAttempt,
+    idempotency: Optional[IdempotentRequest] = Depends(get_idempotency_key),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Record a practice attempt for a word."""
+    """Record a practice attempt for a word.
+
+    With an ``Idempotency-Key`` header, a retry returns the first response
+    instead of counting the attempt again.
+    """
+    if idempotency:
+        replay = await claim_idempotency_key(db, current_user.id, idempotency)
+        if replay is not None:
+            return replay
+
     # Verify child
     child_result = await db.execute(
         select(Child).where(Child.id == child_id, Child.user_id == current_user.id)
@@ -220,22 +395,10 @@ async def record_attempt(
             detail="Child not found"
         )
 
-    # Get or create progress record
-    result = await db.execute(
-        select(Progress).where(
-            Progress.child_id == child_id,
-            Progress.word_id == word_id
-        )
-    )
-    progress = result.scalar_one_or_none()
+    # Get or create the progress record, locked so concurrent attempts queue up
+    progress = await lock_progress(db, child_id, word_id)
 
-    if not progress:
-        progress = Progress(
-            child_id=child_id,
-            word_id=word_id,
-            status="unlocked"
-        )
-        db.add(progress)
+    was_mastered = progress.status == ProgressStatus.MASTERED
 
     # Update attempt stats
     progress.attempts += 1
@@ -261,10 +424,27 @@ async def record_attempt(
     else:
         progress.status = "in_progress"
 
-    await db.commit()
-    await db.refresh(progress)
-
-    return ProgressResponse(
+    # Unlock dependents in the same transaction when the word becomes mastered
+    newly_mastered = progress.status == ProgressStatus.MASTERED and not was_mastered
+    await db.flush()
+    unlocked_ids = []
+    if newly_mastered:
+        unlocked_ids = await unlock_dependents(db, child_id, word_id)
+
+    domain_result = await db.execute(select(Word.domain_id).where(Word.id == word_id))
+    domain_id = domain_result.scalar_one_or_none()
+
+    await record_daily_activity(db, child_id, word_id, attempt_data.correct, newly_mastered)
+    await append_attempt_events(db, [{
+        "child_id": child_id,
+        "word_id": word_id,
+        "domain_id": domain_id,
+        "correct": attempt_data.correct,
+        "status": progress.status,
+    }])
+    path_token = await publish_learning_path_change(db, child_id, domain_id)
+
+    response = ProgressResponse(
         id=progress.id,
         word_id=progress.word_id,
         status=progress.status,
@@ -275,3 +455,16 @@ async def record_attempt(
         last_practiced_at=progress.last_practiced_at,
         mastered_at=progress.mastered_at
     )
+    if idempotency:
+        await store_idempotent_response(db, current_user.id, idempotency, response)
+
+    await db.commit()
+
+    # Other workers drop their copy of the plan; this one patches it in place
+    apply_attempt(
+        child_id, domain_id, word_id,
+        WordState(progress.status, progress.attempts, progress.correct_count),
+        unlocked_ids, path_token
+    )
+
+    return response
@@ -0,0 +1,145 @@
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.user import User
+from app.models.domain import Domain
+from app.models.word import Word, WordTranslation
+from app.models.progress import Child
+from app.schemas.domain import WordSearchResult, WordRelationsResponse
+from app.dependencies import get_current_user
+from app.core.text import normalize_search_text, prefix_upper_bound
+from app.services.language_service import parse_languages
+from app.services.prerequisite_service import get_related_words, PREREQUISITES, DEPENDENTS
+
+router = APIRouter(prefix="/words", tags=["Words"])
+
+
+@router.get("/search", response_model=list[WordSearchResult])
+async def search_words(
+    q: str = Query(..., min_length=1, max_length=100),
+    lang: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search word translations by prefix, ignoring case and diacritics."""
+    prefix = normalize_search_text(q)
+    if not prefix:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query is empty"
+        )
+
+    # A range over the "C"-collated normalized text walks the index in order,
+    # so autocomplete stops after `limit` rows instead of scanning matches.
+    query = (
+        select(
+            WordTranslation.word_id,
+            WordTranslation.language,
+            WordTranslation.text,
+            Word.domain_id,
+            Word.difficulty,
+            Domain.name.label("domain_name"),
+            Domain.is_system
+        )
+        .join(Word, WordTranslation.word_id == Word.id)
+        .join(Domain, Word.domain_id == Domain.id)
+        .where(
+            WordTranslation.text_normalized >= prefix,
+            WordTranslation.text_normalized < prefix_upper_bound(prefix),
+            (Domain.user_id == current_user.id) | (Domain.is_system == True),
+            Word.is_active == True
+        )
+        .order_by(WordTranslation.text_normalized, WordTranslation.language)
+        .limit(limit)
+    )
+    if lang:
+        query = query.where(WordTranslation.language == lang.strip().lower())
+
+    result = await db.execute(query)
+
+    return [
+        WordSearchResult(
+            word_id=row.word_id,
+            domain_id=row.domain_id,
+            domain_name=row.domain_name,
+            is_system=row.is_system,
+            language=row.language,
+            text=row.text,
+            difficulty=row.difficulty
+        )
+        for row in result.all()
+    ]
+
+
+async def _word_relations(
+    word_id: uuid.UUID,
+    direction: str,
+    max_depth: int,
+    child_id: Optional[uuid.UUID],
+    lang: Optional[str],
+    current_user: User,
+    db: AsyncSession,
+) -> dict:
+    # Verify the word is in a domain the user can read
+    word_result = await db.execute(
+        select(Word.id)
+        .join(Domain, Word.domain_id == Domain.id)
+        .where(
+            Word.id == word_id,
+            (Domain.user_id == current_user.id) | (Domain.is_system == True)
+        )
+    )
+    if word_result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Word not found"
+        )
+
+    languages = parse_languages(lang)
+    if child_id is not None:
+        child_result = await db.execute(
+            select(Child).where(Child.id == child_id, Child.user_id == current_user.id)
+        )
+        child = child_result.scalar_one_or_none()
+
+        if not child:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Child not found"
+            )
+        languages = parse_languages(lang, default=child.preferred_language)
+
+    return await get_related_words(
+        db, word_id, current_user.id, direction, max_depth, child_id, languages
+    )
+
+
+@router.get("/{word_id}/prerequisites", response_model=WordRelationsResponse)
+async def get_word_prerequisites(
+    word_id: uuid.UUID,
+    max_depth: int = Query(20, ge=1, le=100),
+    child_id: Optional[uuid.UUID] = None,
+    lang: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get every word that must be learned before this one, nearest first."""
+    return await _word_relations(word_id, PREREQUISITES, max_depth, child_id, lang, current_user, db)
+
+
+@router.get("/{word_id}/dependents", response_model=WordRelationsResponse)
+async def get_word_dependents(
+    word_id: uuid.UUID,
+    max_depth: int = Query(20, ge=1, le=100),
+    child_id: Optional[uuid.UUID] = None,
+    lang: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get every word that learning this one leads to, nearest first."""
+    return await _word_relations(word_id, DEPENDENTS, max_depth, child_id, lang, current_user, db)
@@ -7,7 +7,30 @@ class Settings(BaseSettings):
     secret_key: str = "dev-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    token_cache_size: int = 10000
     frontend_url: str = "http://localhost:5173"
+    attempt_event_months_ahead: int = 2
+    attempt_event_retention_months: int = 24
+    child_partition_count: int = 16
+    task_queue_maxsize: int = 1000
+    task_queue_workers: int = 2
+    task_queue_max_retries: int = 3
+    task_queue_retry_delay: float = 0.5
+    content_cache_size: int = 512
+    content_cache_ttl: float = 300.0
+    learning_path_cache_size: int = 2048
+    learning_path_cache_ttl: float = 600.0
+    system_snapshot_path: str = "/tmp/learningtoy-system-content.bin"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Analytics reads are shed once fewer pool connections than this are free
+    db_pool_reserved_for_writes: int = 5
+    child_write_rate: float = 2.0
+    child_write_burst: int = 20
+    parent_write_rate: float = 10.0
+    parent_write_burst: int = 60
+    rate_limit_buckets: int = 10000
+    idempotency_key_ttl_hours: int = 24
 
     class Config:
         env_file = ".env"
@@ -18,4 +41,8 @@ def get_settings() -> Settings:
     return Settings()
 
 
-settings = get_settings()
+def __getattr__(name: str):
+    # `settings` is built on first access rather than at import time
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
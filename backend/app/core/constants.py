@@ -12,6 +12,10 @@ class LanguageCode(str, Enum):
     ES = "es"
 
 
+# Used when a word has no translation in any requested language.
+DEFAULT_LANGUAGE = LanguageCode.EN
+
+
 class DifficultyLevel(str, Enum):
     BEGINNER = "beginner"
     INTERMEDIATE = "intermediate"
@@ -26,6 +30,30 @@ class ProgressStatus(str, Enum):
     MASTERED = "mastered"
 
 
+# Statuses of words a child can practice right now
+LEARNABLE_STATUSES = (
+    ProgressStatus.UNLOCKED,
+    ProgressStatus.IN_PROGRESS,
+    ProgressStatus.PRACTICING,
+)
+
+
+# Compact one-byte codes used in progress snapshots; 0 means no progress yet.
+PROGRESS_STATUS_CODES = {
+    ProgressStatus.LOCKED: 1,
+    ProgressStatus.UNLOCKED: 2,
+    ProgressStatus.IN_PROGRESS: 3,
+    ProgressStatus.PRACTICING: 4,
+    ProgressStatus.MASTERED: 5,
+}
+
+
+class ContentEntity(str, Enum):
+    WORD = "word"
+    TRANSLATION = "translation"
+    PREREQUISITE = "prerequisite"
+
+
 LANGUAGE_NAMES = {
     LanguageCode.EN: "English",
     LanguageCode.PL: "Polish",
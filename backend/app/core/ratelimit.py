@@ -0,0 +1,71 @@
+import time
+from typing import Hashable
+
+from app.config import settings
+from app.core.cache import LRUCache
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float):
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class RateLimiter:
+    """In-process token buckets, one per key.
+
+    Each bucket refills at ``rate`` tokens per second up to ``burst``. A
+    bucket left alone for ``burst / rate`` seconds is full again, so that is
+    its TTL in the LRU: dropping it then loses nothing.
+    """
+
+    def __init__(self, rate: float, burst: int, maxsize: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = LRUCache(maxsize=maxsize, ttl=burst / rate)
+        self.rejected = 0
+
+    def _refill(self, key: Hashable, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return TokenBucket(self.burst, now)
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+        bucket.updated_at = now
+        return bucket
+
+    def stats(self) -> dict:
+        return {"buckets": self._buckets.stats()["size"], "rejected": self.rejected}
+
+
+def acquire(*limits: tuple[RateLimiter, Hashable]) -> float:
+    """Take one token from each ``(limiter, key)`` bucket, or from none.
+
+    Returns 0 when the tokens were taken, otherwise the seconds until every
+    bucket has one again. A request rejected by one limit does not use up
+    the others.
+    """
+    now = time.monotonic()
+    buckets = [(limiter, key, limiter._refill(key, now)) for limiter, key in limits]
+
+    wait = 0.0
+    for limiter, key, bucket in buckets:
+        if bucket.tokens < 1:
+            limiter.rejected += 1
+            wait = max(wait, (1 - bucket.tokens) / limiter.rate)
+
+    for limiter, key, bucket in buckets:
+        if not wait:
+            bucket.tokens -= 1
+        limiter._buckets.set(key, bucket)
+    return wait
+
+
+# Device writes (attempts, chat) per child, and every write per parent account
+child_write_limiter = RateLimiter(
+    settings.child_write_rate, settings.child_write_burst, settings.rate_limit_buckets
+)
+parent_write_limiter = RateLimiter(
+    settings.parent_write_rate, settings.parent_write_burst, settings.rate_limit_buckets
+)
@@ -1,9 +1,18 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 import bcrypt
 from jose import JWTError, jwt
 from app.config import settings
+from app.core.cache import LRUCache
+
+# Verified claims by token digest, each kept until the token's own expiry
+token_cache = LRUCache(maxsize=settings.token_cache_size)
+
+# Revoked token digests and the wall-clock time their token would have expired
+_revoked_tokens: dict[bytes, float] = {}
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -25,9 +34,47 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
 def decode_access_token(token: str) -> Optional[dict]:
+    """Verify a token and return its claims, or None if it is invalid or revoked.
+
+    Verified claims are cached by token digest until the token expires, so a
+    token seen before costs a dictionary lookup. Failures are not cached.
+    The returned dict is shared with the cache and must not be modified.
+    """
+    digest = token_digest(token)
+    revoked_until = _revoked_tokens.get(digest)
+    if revoked_until is not None and revoked_until > time.time():
+        return None
+
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
     except JWTError:
         return None
+
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        token_cache.set(digest, payload, ttl=expires_at - time.time())
+    return payload
+
+
+def revoke_token_digest(digest: bytes, expires_at: float) -> None:
+    """Reject a token in this process until it would have expired anyway."""
+    now = time.time()
+    for expired in [d for d, until in _revoked_tokens.items() if until <= now]:
+        del _revoked_tokens[expired]
+
+    token_cache.delete(digest)
+    if expires_at > now:
+        _revoked_tokens[digest] = expires_at
+
+
+def revoked_token_count() -> int:
+    return len(_revoked_tokens)
@@ -0,0 +1,165 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+_AFTER_COMMIT_KEY = "after_commit_jobs"
+
+
+@dataclass
+class Job:
+    key: Hashable
+    func: Callable[..., Awaitable[Any]]
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+
+
+class TaskQueue:
+    """Bounded asyncio queue with a few workers for post-commit follow-up work.
+
+    Jobs are keyed: submitting a key that is already waiting is a no-op, so
+    bursts of "rebuild X" requests collapse into one run. Failed jobs are
+    retried with exponential backoff. Jobs must open their own DB session.
+    """
+
+    def __init__(self, maxsize: int, workers: int, max_retries: int, retry_delay: float):
+        self.maxsize = maxsize
+        self.worker_count = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._pending: set[Hashable] = set()
+        self._accepting = False
+        self._active = 0
+        self._counters = {
+            "submitted": 0,
+            "coalesced": 0,
+            "rejected": 0,
+            "processed": 0,
+            "retried": 0,
+            "failed": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._accepting
+
+    async def start(self) -> None:
+        if self._accepting:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._accepting = True
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"task-queue-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop taking jobs, let queued ones finish, then stop the workers."""
+        if not self._accepting:
+            return
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Task queue stopped with {self._queue.qsize()} jobs left")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+
+    def submit(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> bool:
+        """Queue a job unless one with the same key is already waiting.
+
+        Returns False when the job was dropped because the queue is stopped
+        or full. Callers treat queued work as best effort.
+        """
+        if not self._accepting:
+            self._counters["rejected"] += 1
+            return False
+        if key in self._pending:
+            self._counters["coalesced"] += 1
+            return True
+        try:
+            self._queue.put_nowait(Job(key, func, args, kwargs))
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            return False
+        self._pending.add(key)
+        self._counters["submitted"] += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "running": self._accepting,
+            "depth": self._queue.qsize() if self._queue else 0,
+            "maxsize": self.maxsize,
+            "active": self._active,
+            **self._counters,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            # A new submit for this key while it runs queues another pass
+            self._pending.discard(job.key)
+            self._active += 1
+            try:
+                await self._run(job)
+            finally:
+                self._active -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await job.func(*job.args, **job.kwargs)
+                self._counters["processed"] += 1
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    self._counters["failed"] += 1
+                    print(f"Background job {job.key!r} failed: {exc}")
+                    return
+                self._counters["retried"] += 1
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+
+task_queue = TaskQueue(
+    maxsize=settings.task_queue_maxsize,
+    workers=settings.task_queue_workers,
+    max_retries=settings.task_queue_max_retries,
+    retry_delay=settings.task_queue_retry_delay,
+)
+
+
+def enqueue_after_commit(
+    db: AsyncSession,
+    key: Hashable,
+    func: Callable[..., Awaitable[Any]],
+    *args,
+    **kwargs,
+) -> None:
+    """Submit a job to the task queue once ``db`` commits; drop it on rollback."""
+    jobs = db.sync_session.info.setdefault(_AFTER_COMMIT_KEY, [])
+    jobs.append(Job(key, func, args, kwargs))
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_after_commit_jobs(session: Session) -> None:
+    for job in session.info.pop(_AFTER_COMMIT_KEY, []):
+        task_queue.submit(job.key, job.func, *job.args, **job.kwargs)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_commit_jobs(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT_KEY, None)
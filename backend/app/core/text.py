@@ -0,0 +1,23 @@
+import unicodedata
+
+# Letters that Unicode does not decompose into a base letter plus a mark
+_FOLD_LETTERS = str.maketrans({
+    "ł": "l",
+    "đ": "d",
+    "ø": "o",
+    "ß": "ss",
+    "æ": "ae",
+    "œ": "oe",
+})
+
+
+def normalize_search_text(text: str) -> str:
+    """Fold text for case- and diacritic-insensitive matching ("Królik" -> "krolik")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.translate(_FOLD_LETTERS).split())
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
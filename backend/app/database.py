@@ -1,21 +1,67 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.config import settings
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=True,
-    future=True,
-)
+Base = declarative_base()
 
-async_session = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+# Built on first use, so importing models does not read settings or create a pool
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[sessionmaker] = None
 
-Base = declarative_base()
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        _engine = create_async_engine(
+            settings.database_url,
+            echo=True,
+            future=True,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+        )
+    return _engine
+
+
+def pool_checked_out() -> int:
+    """Connections currently taken from the pool, 0 before the engine exists."""
+    if _engine is None:
+        return 0
+    return _engine.pool.checkedout()
+
+
+def get_sessionmaker() -> sessionmaker:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+    return _sessionmaker
+
+
+def async_session() -> AsyncSession:
+    return get_sessionmaker()()
+
+
+async def dispose_engine() -> None:
+    """Close the connection pool; the next get_engine() builds a new one."""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
+
+
+def __getattr__(name: str):
+    # Keeps `from app.database import engine` working for existing scripts
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def get_db() -> AsyncSession:
@@ -1,11 +1,17 @@
 import uuid
 import asyncio
 from datetime import datetime
+from pathlib import Path
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session, Base, engine
+from app.database import async_session, Base, get_engine, dispose_engine
 from app.models import User, Child, Domain, Word, WordTranslation, WordPrerequisite
+from app.services.partition_service import maintain_attempt_event_partitions, ensure_child_partitions
+from app.services.prerequisite_service import rebuild_prerequisite_closure
 
 
 # Sample domains data
@@ -540,21 +546,41 @@ async def seed_database(db: AsyncSession) -> None:
 
         print(f"Created domain: {domain.name} with {len(domain_data['words'])} words")
 
+    await db.flush()
+    print(f"Built prerequisite closure: {await rebuild_prerequisite_closure(db)} rows")
+
     await db.commit()
     print("Database seeding complete!")
 
 
+def stamp_head(connection) -> None:
+    """Record the schema built by ``create_all`` as the latest migration.
+
+    Without this, ``alembic upgrade head`` would replay every migration
+    against tables that already have their final shape.
+    """
+    backend = Path(__file__).resolve().parents[2]
+    config = Config(str(backend / "alembic.ini"))
+    config.set_main_option("script_location", str(backend / "alembic"))
+    MigrationContext.configure(connection).stamp(ScriptDirectory.from_config(config), "head")
+
+
 async def main():
     """Main entry point for seeding."""
     # Create all tables
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+        await maintain_attempt_event_partitions(conn)
+        await ensure_child_partitions(conn)
+        await conn.run_sync(stamp_head)
 
     # Seed data
     async with async_session() as db:
         await seed_database(db)
 
+    await dispose_engine()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,12 +1,16 @@
+import math
 import uuid
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, pool_checked_out
 from app.models.user import User
+from app.core.ratelimit import acquire, child_write_limiter, parent_write_limiter
 from app.core.security import decode_access_token
+from app.services.idempotency_service import MAX_KEY_LENGTH, IdempotentRequest, fingerprint
 
 security = HTTPBearer()
 
@@ -64,3 +68,72 @@ async def get_child_by_id(
         )
 
     return child
+
+
+async def limit_writes(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> None:
+    """Reject writes over the per-parent and per-child rate limits with 429.
+
+    Works from the token and the request alone, so a rejected request never
+    takes a database connection. Declare it in the route's ``dependencies``
+    so it runs before ``get_current_user``. The child comes from the path or
+    the JSON body; child buckets are keyed by parent as well, so nobody can
+    drain another account's limit.
+    """
+    payload = decode_access_token(credentials.credentials)
+    parent_id = payload.get("sub") if payload else None
+    if parent_id is None:
+        return  # get_current_user rejects the request
+
+    limits = [(parent_write_limiter, parent_id)]
+    child_id = request.path_params.get("child_id")
+    if child_id is None:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict):
+            child_id = body.get("child_id")
+    if child_id is not None:
+        limits.append((child_write_limiter, (parent_id, str(child_id))))
+
+    retry_after = acquire(*limits)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+
+async def shed_when_busy() -> None:
+    """Turn away dashboard analytics reads with 503 while the pool is nearly used up.
+
+    The last ``db_pool_reserved_for_writes`` connections are kept for
+    device writes.
+    """
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    if pool_checked_out() >= capacity - settings.db_pool_reserved_for_writes:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy",
+            headers={"Retry-After": "1"}
+        )
+
+
+async def get_idempotency_key(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> Optional[IdempotentRequest]:
+    """The request's ``Idempotency-Key`` and fingerprint, or None without the header."""
+    if idempotency_key is None:
+        return None
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+    body = await request.body()
+    return IdempotentRequest(idempotency_key, fingerprint(request.method, request.url.path, body))
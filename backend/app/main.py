@@ -1,55 +1,157 @@
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.config import settings
-from app.api import auth, domains, progress, chat
+
+# How often upcoming attempt_events partitions are created and old ones dropped
+PARTITION_MAINTENANCE_INTERVAL = 24 * 60 * 60
+
+# How often expired idempotency keys are deleted
+IDEMPOTENCY_PURGE_INTERVAL = 60 * 60
+
+
+async def maintain_partitions():
+    from app.database import get_engine
+    from app.services.partition_service import maintain_attempt_event_partitions
+
+    async with get_engine().begin() as conn:
+        await maintain_attempt_event_partitions(conn)
+
+
+async def partition_maintenance_loop():
+    """Keep attempt_events partitions ahead of the clock while the app runs.
+
+    The first pass runs in ``lifespan`` before the app serves requests.
+    """
+    from app.core.tasks import task_queue
+
+    while True:
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL)
+        task_queue.submit("maintain-partitions", maintain_partitions)
+
+
+async def idempotency_purge_loop():
+    """Keep the idempotency key store down to keys that can still be replayed."""
+    from app.core.tasks import task_queue
+    from app.services.idempotency_service import purge_idempotency_keys
+
+    while True:
+        task_queue.submit("purge-idempotency-keys", purge_idempotency_keys)
+        await asyncio.sleep(IDEMPOTENCY_PURGE_INTERVAL)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
+    from app.config import get_settings
+    from app.database import get_engine, dispose_engine
+    from app.core.tasks import task_queue
+    from app.services.cache_service import InvalidationListener, listener_dsn
+    from app.services.system_content_service import load_system_snapshot, close_system_snapshot
+    from app.services.auth_service import load_revoked_tokens
+
     # Startup
     print("Starting LearningToy API...")
+    settings = get_settings()
+    get_engine()
+    # Attempts write to the current month's partition, so it must exist first
+    await maintain_partitions()
+    # Logged-out tokens must be rejected from the first request on
+    await load_revoked_tokens()
+    await task_queue.start()
+    task_queue.submit("system-snapshot", load_system_snapshot)
+
+    # Drops cached domain content when any worker commits a change
+    app.state.invalidation_listener = InvalidationListener(listener_dsn(settings.database_url))
+    maintenance_task = asyncio.create_task(partition_maintenance_loop())
+    purge_task = asyncio.create_task(idempotency_purge_loop())
+    invalidation_task = asyncio.create_task(app.state.invalidation_listener.run())
     yield
     # Shutdown
     print("Shutting down LearningToy API...")
+    for background_task in (maintenance_task, purge_task, invalidation_task):
+        background_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await background_task
+    await task_queue.stop()
+    close_system_snapshot()
+    await dispose_engine()
+
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application.
+
+    Routers (and through them every model and service) are imported here,
+    so scripts that only need models never pay for the web app.
+    """
+    from app.config import get_settings
+    from app.api import auth, domains, words, progress, chat
+
+    settings = get_settings()
+
+    application = FastAPI(
+        title="LearningToy API",
+        description="Backend for children's language learning application",
+        version="0.1.0",
+        lifespan=lifespan
+    )
+
+    # Configure CORS
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=[settings.frontend_url, "http://localhost:5173"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Include routers
+    application.include_router(auth.router, prefix="/api/v1")
+    application.include_router(domains.router, prefix="/api/v1")
+    application.include_router(words.router, prefix="/api/v1")
+    application.include_router(progress.router, prefix="/api/v1")
+    application.include_router(chat.router, prefix="/api/v1")
+
+    @application.get("/")
+    async def root():
+        """Root endpoint - API health check."""
+        return {
+            "name": "LearningToy API",
+            "version": "0.1.0",
+            "status": "healthy"
+        }
+
+    @application.get("/health")
+    async def health(request: Request):
+        """Health check endpoint."""
+        from app.core.tasks import task_queue
+        from app.services.cache_service import content_cache
+        from app.core.security import token_cache, revoked_token_count
+        from app.core.ratelimit import child_write_limiter, parent_write_limiter
+        from app.database import pool_checked_out
+
+        listener = getattr(request.app.state, "invalidation_listener", None)
+        return {
+            "status": "healthy",
+            "tasks": task_queue.stats(),
+            "cache": {**content_cache.stats(), "listening": bool(listener and listener.connected)},
+            "auth": {**token_cache.stats(), "revoked": revoked_token_count()},
+            "rate_limits": {"child": child_write_limiter.stats(), "parent": parent_write_limiter.stats()},
+            "pool": {"checked_out": pool_checked_out()}
+        }
+
+    return application
+
+
+_app: Optional[FastAPI] = None
 
 
-# Create FastAPI app
-app = FastAPI(
-    title="LearningToy API",
-    description="Backend for children's language learning application",
-    version="0.1.0",
-    lifespan=lifespan
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[settings.frontend_url, "http://localhost:5173"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router, prefix="/api/v1")
-app.include_router(domains.router, prefix="/api/v1")
-app.include_router(progress.router, prefix="/api/v1")
-app.include_router(chat.router, prefix="/api/v1")
-
-
-@app.get("/")
-async def root():
-    """Root endpoint - API health check."""
-    return {
-        "name": "LearningToy API",
-        "version": "0.1.0",
-        "status": "healthy"
-    }
-
-
-@app.get("/health")
-async def health():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+def __getattr__(name: str):
+    # `uvicorn app.main:app` builds the application on first access
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
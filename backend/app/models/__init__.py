@@ -1,17 +1,23 @@
-from app.models.user import User
+from app.models.user import User, RevokedToken, IdempotencyKey
 from app.models.domain import Domain
-from app.models.word import Word, WordTranslation, WordPrerequisite
-from app.models.progress import Progress, Child
+from app.models.word import Word, WordTranslation, WordPrerequisite, WordPrerequisiteClosure, ContentTombstone
+from app.models.progress import Progress, Child, DailyActivity, AttemptEvent
 from app.models.chat import ChatSession, ChatMessage
 
 __all__ = [
     "User",
+    "RevokedToken",
+    "IdempotencyKey",
     "Child",
     "Domain",
     "Word",
     "WordTranslation",
     "WordPrerequisite",
+    "WordPrerequisiteClosure",
+    "ContentTombstone",
     "Progress",
+    "DailyActivity",
+    "AttemptEvent",
     "ChatSession",
     "ChatMessage",
 ]
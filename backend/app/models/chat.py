@@ -1,16 +1,17 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, ForeignKeyConstraint, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class ChatSession(Base):
+    """A chat session, hash-partitioned by child like its messages."""
     __tablename__ = "chat_sessions"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    child_id = Column(UUID(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), nullable=False)
+    child_id = Column(UUID(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), primary_key=True)
     domain_id = Column(UUID(as_uuid=True), ForeignKey("domains.id", ondelete="SET NULL"), nullable=True)
     started_at = Column(DateTime, default=datetime.utcnow)
     ended_at = Column(DateTime, nullable=True)
@@ -20,12 +21,18 @@ class ChatSession(Base):
     child = relationship("Child", back_populates="chat_sessions")
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        {"postgresql_partition_by": "HASH (child_id)"},
+    )
+
 
 class ChatMessage(Base):
+    """A chat message. ``child_id`` repeats the session's, so both live in the same partition."""
     __tablename__ = "chat_messages"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    session_id = Column(UUID(as_uuid=True), ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(UUID(as_uuid=True), nullable=False)
+    child_id = Column(UUID(as_uuid=True), primary_key=True)
     role = Column(String(20), nullable=False)  # 'user', 'assistant', 'system'
     content = Column(Text, nullable=False)
     word_id = Column(UUID(as_uuid=True), ForeignKey("words.id", ondelete="SET NULL"), nullable=True)
@@ -33,3 +40,13 @@ class ChatMessage(Base):
 
     # Relationships
     session = relationship("ChatSession", back_populates="messages")
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["session_id", "child_id"],
+            ["chat_sessions.id", "chat_sessions.child_id"],
+            ondelete="CASCADE"
+        ),
+        Index("ix_chat_messages_session_created", "session_id", "created_at"),
+        {"postgresql_partition_by": "HASH (child_id)"},
+    )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, DateTime, Date, Integer, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Date, Integer, Boolean, ForeignKey, UniqueConstraint, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -11,7 +11,7 @@ class Child(Base):
     __tablename__ = "children"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     birth_date = Column(Date, nullable=True)
     avatar_url = Column(String(500), nullable=True)
@@ -25,10 +25,16 @@ class Child(Base):
 
 
 class Progress(Base):
+    """A child's state on one word, hash-partitioned by child.
+
+    Partitions are created by ``app.services.partition_service``. The
+    partition key has to be part of every unique constraint, so it is part
+    of the primary key too.
+    """
     __tablename__ = "progress"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    child_id = Column(UUID(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), nullable=False)
+    child_id = Column(UUID(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), primary_key=True)
     word_id = Column(UUID(as_uuid=True), ForeignKey("words.id", ondelete="CASCADE"), nullable=False)
     status = Column(SQLEnum(ProgressStatus), nullable=False, default=ProgressStatus.LOCKED)
     attempts = Column(Integer, default=0)
@@ -43,3 +49,43 @@ class Progress(Base):
     # Relationships
     child = relationship("Child", back_populates="progress")
     word = relationship("Word")
+
+    __table_args__ = (
+        UniqueConstraint("child_id", "word_id", name="uq_child_word"),
+        Index("ix_progress_child_status", "child_id", "status"),
+        {"postgresql_partition_by": "HASH (child_id)"},
+    )
+
+
+class DailyActivity(Base):
+    """Per-day rollup of a child's attempts in a domain, for charts and streaks."""
+    __tablename__ = "daily_activity"
+
+    child_id = Column(UUID(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    domain_id = Column(UUID(as_uuid=True), ForeignKey("domains.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+    mastered_count = Column(Integer, nullable=False, default=0)
+
+
+class AttemptEvent(Base):
+    """Append-only log of every practice attempt, range-partitioned by month.
+
+    Partitions are created ahead of time by ``app.services.partition_service``.
+    There is no foreign key to words, so history outlives deleted content.
+    """
+    __tablename__ = "attempt_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    child_id = Column(UUID(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), nullable=False)
+    word_id = Column(UUID(as_uuid=True), nullable=False)
+    domain_id = Column(UUID(as_uuid=True), nullable=True)
+    correct = Column(Boolean, nullable=False)
+    status = Column(SQLEnum(ProgressStatus), nullable=False)
+
+    __table_args__ = (
+        Index("ix_attempt_events_child_created", "child_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
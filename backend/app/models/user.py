@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Integer, LargeBinary, ForeignKey, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -20,3 +20,25 @@ class User(Base):
     # Relationships
     children = relationship("Child", back_populates="user", cascade="all, delete-orphan")
     domains = relationship("Domain", back_populates="user", cascade="all, delete-orphan")
+
+
+class RevokedToken(Base):
+    """Access token revoked before its expiry (logout)."""
+    __tablename__ = "revoked_tokens"
+
+    token_digest = Column(String(64), primary_key=True)  # hex SHA-256 of the token
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+
+
+class IdempotencyKey(Base):
+    """Response of a write sent with an ``Idempotency-Key`` header, replayed on retries."""
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # hex SHA-256 of method, path and body
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,10 +1,15 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Boolean, UniqueConstraint, Text
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Boolean, UniqueConstraint, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
 from app.core.constants import DifficultyLevel, LanguageCode
+from app.core.text import normalize_search_text
+
+
+def _normalized_text_default(context) -> str:
+    return normalize_search_text(context.get_current_parameters()["text"])
 
 
 class Word(Base):
@@ -18,6 +23,7 @@ class Word(Base):
     sort_order = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     domain = relationship("Domain", back_populates="words")
@@ -35,6 +41,10 @@ class Word(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_words_domain_updated", "domain_id", "updated_at"),
+    )
+
 
 class WordTranslation(Base):
     __tablename__ = "word_translations"
@@ -43,17 +53,27 @@ class WordTranslation(Base):
     word_id = Column(UUID(as_uuid=True), ForeignKey("words.id", ondelete="CASCADE"), nullable=False)
     language = Column(String(5), nullable=False)
     text = Column(String(200), nullable=False)
+    # Folded copy of text for search; "C" collation keeps prefix ranges contiguous
+    text_normalized = Column(String(200, collation="C"), nullable=False, default=_normalized_text_default)
     phonetic = Column(String(500), nullable=True)
     example_sentence = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     word = relationship("Word", back_populates="translations")
 
     __table_args__ = (
         UniqueConstraint("word_id", "language", name="uq_word_language"),
+        Index("ix_word_translations_language_search", "language", "text_normalized"),
+        Index("ix_word_translations_search", "text_normalized"),
     )
 
+    @validates("text")
+    def _normalize_text(self, key, value):
+        self.text_normalized = normalize_search_text(value) if value is not None else None
+        return value
+
 
 class WordPrerequisite(Base):
     __tablename__ = "word_prerequisites"
@@ -69,4 +89,39 @@ class WordPrerequisite(Base):
 
     __table_args__ = (
         UniqueConstraint("word_id", "prerequisite_id", name="uq_word_prerequisite"),
+        Index("ix_word_prerequisites_prerequisite", "prerequisite_id"),
+    )
+
+
+class WordPrerequisiteClosure(Base):
+    """Transitive closure of word_prerequisites: every (ancestor, descendant) pair.
+
+    ``distance`` is the length of the shortest prerequisite chain. Kept in
+    step with edge writes by app.services.prerequisite_service.
+    """
+    __tablename__ = "word_prerequisite_closure"
+
+    ancestor_id = Column(UUID(as_uuid=True), ForeignKey("words.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(UUID(as_uuid=True), ForeignKey("words.id", ondelete="CASCADE"), primary_key=True)
+    distance = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_word_prerequisite_closure_descendant", "descendant_id", "distance"),
+    )
+
+
+class ContentTombstone(Base):
+    """Record of deleted domain content, so devices can drop it on delta sync."""
+    __tablename__ = "content_tombstones"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    domain_id = Column(UUID(as_uuid=True), ForeignKey("domains.id", ondelete="CASCADE"), nullable=False)
+    entity_type = Column(String(20), nullable=False)  # 'word', 'translation', 'prerequisite'
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    word_id = Column(UUID(as_uuid=True), nullable=True)
+    prerequisite_id = Column(UUID(as_uuid=True), nullable=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_content_tombstones_domain_deleted", "domain_id", "deleted_at"),
     )
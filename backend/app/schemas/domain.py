@@ -66,6 +66,26 @@ class WordUpdate(BaseModel):
     translations: Optional[list[WordTranslationBase]] = None
 
 
+class WordBatchUpdateItem(WordUpdate):
+    id: uuid.UUID
+    add_prerequisite_ids: list[uuid.UUID] = []
+    remove_prerequisite_ids: list[uuid.UUID] = []
+
+
+class WordBatchUpdate(BaseModel):
+    words: list[WordBatchUpdateItem] = Field(..., min_length=1, max_length=1000)
+
+
+class WordBatchDelete(BaseModel):
+    word_ids: list[uuid.UUID] = Field(..., min_length=1, max_length=1000)
+
+
+class WordBatchResult(BaseModel):
+    domain_id: uuid.UUID
+    content_version: int
+    word_count: int  # words updated or deleted
+
+
 class WordResponse(WordBase):
     id: uuid.UUID
     translations: list[WordTranslationResponse]
@@ -74,3 +94,66 @@ class WordResponse(WordBase):
 
     class Config:
         from_attributes = True
+
+
+class WordChange(BaseModel):
+    id: uuid.UUID
+    domain_id: uuid.UUID
+    difficulty: str
+    image_url: Optional[str] = None
+    sort_order: int
+    is_active: bool
+    updated_at: datetime
+
+
+class WordTranslationChange(WordTranslationResponse):
+    word_id: uuid.UUID
+    updated_at: datetime
+
+
+class PrerequisiteEdge(BaseModel):
+    word_id: uuid.UUID
+    prerequisite_id: uuid.UUID
+
+
+class DeletedContent(BaseModel):
+    words: list[uuid.UUID] = []
+    translations: list[uuid.UUID] = []
+    prerequisites: list[PrerequisiteEdge] = []
+
+
+class DomainChangesResponse(BaseModel):
+    domain_id: uuid.UUID
+    content_version: int
+    cursor: datetime
+    words: list[WordChange] = []
+    translations: list[WordTranslationChange] = []
+    prerequisites: list[PrerequisiteEdge] = []
+    deleted: DeletedContent = DeletedContent()
+
+
+class WordSearchResult(BaseModel):
+    word_id: uuid.UUID
+    domain_id: uuid.UUID
+    domain_name: str
+    is_system: bool
+    language: str
+    text: str
+    difficulty: str
+
+
+class RelatedWord(BaseModel):
+    word_id: uuid.UUID
+    domain_id: uuid.UUID
+    depth: int
+    difficulty: str
+    translations: dict[str, str]
+    status: Optional[str] = None  # child's progress status, when child_id was given
+
+
+class WordRelationsResponse(BaseModel):
+    word_id: uuid.UUID
+    direction: str  # "prerequisites" or "dependents"
+    max_depth: int
+    words: list[RelatedWord]
+    edges: list[PrerequisiteEdge]
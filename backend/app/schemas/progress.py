@@ -1,5 +1,5 @@
 import uuid
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional
 from pydantic import BaseModel
 
@@ -47,3 +47,63 @@ class DomainProgressResponse(BaseModel):
 
 class NextWordsResponse(BaseModel):
     words: list[WordProgressResponse]
+
+
+class LearningPathStep(BaseModel):
+    step: int
+    word_id: uuid.UUID
+    word_text: dict[str, str]  # language -> text
+    status: str
+    difficulty: str
+    score: int
+    prerequisite_ids: list[uuid.UUID]  # unmastered prerequisites in the domain
+
+
+class LearningPathResponse(BaseModel):
+    child_id: uuid.UUID
+    domain_id: uuid.UUID
+    target_word_id: Optional[uuid.UUID] = None
+    total_steps: int
+    steps: list[LearningPathStep]
+
+
+class ProgressSnapshotResponse(BaseModel):
+    domain_id: uuid.UUID
+    child_id: uuid.UUID
+    word_count: int
+    words_digest: str
+    digest: str
+    word_ids: Optional[str] = None  # base64, 16 bytes per word
+    statuses: str  # base64, one status code per word
+    attempts: Optional[str] = None  # base64, little-endian uint16 per word
+    correct_counts: Optional[str] = None  # base64, little-endian uint16 per word
+
+
+class ChildOverviewResponse(BaseModel):
+    child_id: uuid.UUID
+    name: str
+    preferred_language: Optional[str] = None
+    avatar_url: Optional[str] = None
+    total_words: int
+    mastered: int
+    practicing: int
+    in_progress: int
+    unlocked: int
+    locked: int
+    total_attempts: int
+    total_correct: int
+    accuracy: float
+    last_practiced_at: Optional[datetime] = None
+
+
+class DailyActivityResponse(BaseModel):
+    day: date
+    attempts: int
+    correct_count: int
+    mastered_count: int
+
+
+class ActivityResponse(BaseModel):
+    child_id: uuid.UUID
+    current_streak: int
+    days: list[DailyActivityResponse]
@@ -0,0 +1,65 @@
+import calendar
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import token_digest, revoke_token_digest
+from app.core.tasks import task_queue
+from app.database import async_session
+from app.models.user import RevokedToken
+from app.services.cache_service import on_invalidation, publish_invalidation, RESET
+
+# Invalidation kind carrying "<hex digest>:<exp>" of a revoked access token
+TOKEN_REVOKED = "token"
+
+
+async def revoke_access_token(db: AsyncSession, token: str, payload: dict) -> None:
+    """Revoke a verified token on every worker once the transaction commits.
+
+    The revocation is stored until the token expires, so workers that start
+    later still reject it.
+    """
+    digest = token_digest(token).hex()
+    expires_at = payload["exp"]
+
+    await db.execute(
+        insert(RevokedToken)
+        .values(
+            token_digest=digest,
+            user_id=payload["sub"],
+            expires_at=datetime.utcfromtimestamp(expires_at)
+        )
+        .on_conflict_do_nothing(index_elements=[RevokedToken.token_digest])
+    )
+    await publish_invalidation(db, TOKEN_REVOKED, f"{digest}:{expires_at}")
+
+
+async def load_revoked_tokens() -> int:
+    """Purge expired revocations and load the live ones into this process."""
+    async with async_session() as db:
+        now = datetime.utcnow()
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        result = await db.execute(
+            select(RevokedToken.token_digest, RevokedToken.expires_at)
+            .where(RevokedToken.expires_at > now)
+        )
+        rows = result.all()
+        await db.commit()
+
+    for digest, expires_at in rows:
+        revoke_token_digest(bytes.fromhex(digest), calendar.timegm(expires_at.utctimetuple()))
+    return len(rows)
+
+
+@on_invalidation(TOKEN_REVOKED)
+def _apply_token_revocation(value: Optional[str]) -> None:
+    digest, expires_at = value.split(":")
+    revoke_token_digest(bytes.fromhex(digest), float(expires_at))
+
+
+@on_invalidation(RESET)
+def _reload_revoked_tokens(value: Optional[str]) -> None:
+    # Revocations may have been missed while the listener was disconnected
+    task_queue.submit("revoked-tokens", load_revoked_tokens)
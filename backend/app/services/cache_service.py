@@ -0,0 +1,160 @@
+import asyncio
+import json
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import LRUCache
+
+# Every worker LISTENs on this channel; writers NOTIFY it inside their transaction,
+# so Postgres only delivers the event if and when the write commits.
+INVALIDATION_CHANNEL = "learningtoy_invalidation"
+
+# Invalidation kind sent for any change to a domain's words, translations or edges
+DOMAIN_CONTENT = "domain"
+
+# Pseudo-kind dispatched when events may have been missed (listener reconnect)
+RESET = "reset"
+
+_PENDING_KEY = "pending_invalidations"
+
+content_cache = LRUCache(maxsize=settings.content_cache_size, ttl=settings.content_cache_ttl)
+
+_handlers: dict[str, list[Callable[[Optional[str]], None]]] = {}
+_generations: dict[Hashable, int] = {}
+
+
+def on_invalidation(kind: str):
+    """Register a handler called with the value of every ``kind`` event."""
+    def decorator(func: Callable[[Optional[str]], None]):
+        _handlers.setdefault(kind, []).append(func)
+        return func
+    return decorator
+
+
+def dispatch_invalidation(kind: str, value: Optional[str]) -> None:
+    for handler in _handlers.get(kind, []):
+        try:
+            handler(value)
+        except Exception as exc:
+            print(f"Invalidation handler for {kind!r} failed: {exc}")
+
+
+@on_invalidation(DOMAIN_CONTENT)
+def _drop_domain_content(value: Optional[str]) -> None:
+    _generations[value] = _generations.get(value, 0) + 1
+    content_cache.invalidate_tag(value)
+
+
+@on_invalidation(RESET)
+def _drop_all_content(value: Optional[str]) -> None:
+    _generations.clear()
+    content_cache.clear()
+
+
+def cache_generation(domain_id: Any) -> int:
+    """Invalidation counter of a domain; take it before loading a value."""
+    return _generations.get(str(domain_id), 0)
+
+
+def store_if_current(key: Hashable, value: Any, domain_id: Any, generation: int) -> None:
+    """Cache a loaded value unless the domain was invalidated while it loaded.
+
+    This keeps a slow read from putting stale content back in the cache.
+    """
+    if value is not None and cache_generation(domain_id) == generation:
+        content_cache.set(key, value, tags=(str(domain_id),))
+
+
+async def cached(key: Hashable, loader: Callable[[], Awaitable[Any]], domain_id: Any) -> Any:
+    """Return the cached value for ``key`` or load it and cache it for the domain."""
+    value = content_cache.get(key)
+    if value is not None:
+        return value
+
+    generation = cache_generation(domain_id)
+    value = await loader()
+    store_if_current(key, value, domain_id, generation)
+    return value
+
+
+async def publish_invalidation(db: AsyncSession, kind: str, value: Any) -> None:
+    """Announce a change to every worker once the current transaction commits.
+
+    The local process drops its entries right after commit as well, so the
+    writer reads its own changes without waiting for the notification.
+    """
+    payload = json.dumps({"kind": kind, "value": str(value)})
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": INVALIDATION_CHANNEL, "payload": payload}
+    )
+    db.sync_session.info.setdefault(_PENDING_KEY, []).append((kind, str(value)))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_local_invalidations(session: Session) -> None:
+    for kind, value in session.info.pop(_PENDING_KEY, []):
+        dispatch_invalidation(kind, value)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_local_invalidations(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+class InvalidationListener:
+    """Keeps a dedicated asyncpg connection LISTENing for invalidation events.
+
+    Events published while the connection is down are lost, so every
+    (re)connect dispatches a reset that clears the local caches.
+    """
+
+    def __init__(self, dsn: str, channel: str = INVALIDATION_CHANNEL, reconnect_delay: float = 5.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+
+    async def run(self) -> None:
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception as exc:
+                print(f"Invalidation listener cannot connect: {exc}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            try:
+                await connection.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                dispatch_invalidation(RESET, None)
+                await closed.wait()
+            except Exception as exc:
+                print(f"Invalidation listener failed: {exc}")
+            finally:
+                self.connected = False
+                with suppress(Exception):
+                    await connection.close()
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        dispatch_invalidation(message.get("kind"), message.get("value"))
+
+
+def listener_dsn(database_url: str) -> str:
+    """asyncpg takes a plain postgresql:// URL without the SQLAlchemy driver."""
+    return database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
@@ -0,0 +1,428 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select, update, insert, delete, text, bindparam, String, Integer, Boolean, any_, cast, or_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import ContentEntity
+from app.core.tasks import enqueue_after_commit
+from app.core.text import normalize_search_text
+from app.models.domain import Domain
+from app.models.word import Word, WordTranslation, WordPrerequisite, WordPrerequisiteClosure, ContentTombstone
+from app.schemas.domain import WordBatchUpdateItem
+from app.services.cache_service import publish_invalidation, DOMAIN_CONTENT
+from app.services.layout_service import warm_domain_layout
+from app.services.prerequisite_service import add_prerequisites, lock_closure, recompute_closure
+
+# Rows are stamped with the application clock at flush time, so a transaction
+# that commits just after a sync started can carry a slightly older timestamp.
+# Re-sending that window is harmless because devices apply changes as upserts.
+SYNC_CURSOR_OVERLAP = timedelta(seconds=5)
+
+
+async def mark_domain_changed(db: AsyncSession, domain_id: uuid.UUID) -> None:
+    """Bump the content version of a domain after its words or edges changed.
+
+    Also tells every worker to drop its cached content for the domain once
+    the transaction commits, and lays the new graph out in the background.
+    """
+    await db.execute(
+        update(Domain)
+        .where(Domain.id == domain_id)
+        .values(content_version=Domain.content_version + 1)
+    )
+    await publish_invalidation(db, DOMAIN_CONTENT, domain_id)
+    enqueue_after_commit(db, ("domain-layout", domain_id), warm_domain_layout, domain_id)
+
+
+async def record_tombstones(
+    db: AsyncSession,
+    domain_id: uuid.UUID,
+    entity_type: ContentEntity,
+    rows: list[dict],
+) -> None:
+    """Record deleted content for delta sync.
+
+    Each row needs an ``entity_id`` and may carry ``word_id`` and
+    ``prerequisite_id``. All rows are written with a single INSERT.
+    """
+    if not rows:
+        return
+
+    now = datetime.utcnow()
+    await db.execute(
+        insert(ContentTombstone),
+        [
+            {
+                "id": uuid.uuid4(),
+                "domain_id": domain_id,
+                "entity_type": entity_type.value,
+                "entity_id": row["entity_id"],
+                "word_id": row.get("word_id"),
+                "prerequisite_id": row.get("prerequisite_id"),
+                "deleted_at": now,
+            }
+            for row in rows
+        ],
+    )
+
+
+async def get_domain_changes(
+    db: AsyncSession,
+    domain: Domain,
+    since: Optional[datetime] = None,
+) -> dict:
+    """Collect words, translations and edges changed in a domain since a cursor.
+
+    Without a cursor the whole domain is returned, which is what a device
+    needs for its first sync. The returned cursor is taken before reading,
+    so anything written while the sync runs is picked up next time.
+    """
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    cursor = datetime.utcnow()
+    window_start = since - SYNC_CURSOR_OVERLAP if since else None
+
+    words_query = select(Word).where(Word.domain_id == domain.id)
+    if window_start:
+        words_query = words_query.where(Word.updated_at > window_start)
+    words_result = await db.execute(words_query.order_by(Word.sort_order))
+    words = words_result.scalars().all()
+
+    translations_query = (
+        select(WordTranslation)
+        .join(Word, WordTranslation.word_id == Word.id)
+        .where(Word.domain_id == domain.id)
+    )
+    if window_start:
+        translations_query = translations_query.where(WordTranslation.updated_at > window_start)
+    translations_result = await db.execute(translations_query)
+    translations = translations_result.scalars().all()
+
+    edges_query = (
+        select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
+        .join(Word, WordPrerequisite.word_id == Word.id)
+        .where(Word.domain_id == domain.id)
+    )
+    if window_start:
+        edges_query = edges_query.where(WordPrerequisite.created_at > window_start)
+    edges_result = await db.execute(edges_query)
+
+    deleted = {"words": [], "translations": [], "prerequisites": []}
+    if window_start:
+        tombstones_result = await db.execute(
+            select(ContentTombstone)
+            .where(
+                ContentTombstone.domain_id == domain.id,
+                ContentTombstone.deleted_at > window_start
+            )
+            .order_by(ContentTombstone.deleted_at)
+        )
+        for tombstone in tombstones_result.scalars().all():
+            if tombstone.entity_type == ContentEntity.WORD:
+                deleted["words"].append(tombstone.entity_id)
+            elif tombstone.entity_type == ContentEntity.TRANSLATION:
+                deleted["translations"].append(tombstone.entity_id)
+            elif tombstone.entity_type == ContentEntity.PREREQUISITE:
+                deleted["prerequisites"].append({
+                    "word_id": tombstone.word_id,
+                    "prerequisite_id": tombstone.prerequisite_id
+                })
+
+    return {
+        "domain_id": domain.id,
+        "content_version": domain.content_version,
+        "cursor": cursor,
+        "words": [
+            {
+                "id": w.id,
+                "domain_id": w.domain_id,
+                "difficulty": w.difficulty,
+                "image_url": w.image_url,
+                "sort_order": w.sort_order,
+                "is_active": w.is_active,
+                "updated_at": w.updated_at
+            }
+            for w in words
+        ],
+        "translations": [
+            {
+                "id": t.id,
+                "word_id": t.word_id,
+                "language": t.language,
+                "text": t.text,
+                "phonetic": t.phonetic,
+                "example_sentence": t.example_sentence,
+                "updated_at": t.updated_at
+            }
+            for t in translations
+        ],
+        "prerequisites": [
+            {"word_id": word_id, "prerequisite_id": prereq_id}
+            for word_id, prereq_id in edges_result.all()
+        ],
+        "deleted": deleted
+    }
+
+
+def _uuid_array(ids):
+    return cast(list(ids), ARRAY(UUID(as_uuid=True)))
+
+
+# Scalar fields of a whole batch in one statement. Each array holds one
+# element per word; NULL keeps the current value, except image_url, which
+# can be cleared and so carries an explicit flag.
+_UPDATE_WORDS_SQL = text("""
+UPDATE words AS w SET
+    difficulty = COALESCE(v.difficulty, w.difficulty),
+    image_url = CASE WHEN v.set_image_url THEN v.image_url ELSE w.image_url END,
+    sort_order = COALESCE(v.sort_order, w.sort_order),
+    updated_at = :now
+FROM unnest(:ids, :difficulties, :image_urls, :set_image_urls, :sort_orders)
+    AS v(id, difficulty, image_url, set_image_url, sort_order)
+WHERE w.id = v.id AND w.domain_id = :domain_id
+""").bindparams(
+    bindparam("ids", type_=ARRAY(UUID(as_uuid=True))),
+    bindparam("difficulties", type_=ARRAY(String)),
+    bindparam("image_urls", type_=ARRAY(String)),
+    bindparam("set_image_urls", type_=ARRAY(Boolean)),
+    bindparam("sort_orders", type_=ARRAY(Integer)),
+    bindparam("domain_id", type_=UUID(as_uuid=True)),
+)
+
+_REMOVE_EDGES_SQL = text("""
+DELETE FROM word_prerequisites p
+USING unnest(:word_ids, :prerequisite_ids) AS v(word_id, prerequisite_id)
+WHERE p.word_id = v.word_id AND p.prerequisite_id = v.prerequisite_id
+RETURNING p.id, p.word_id, p.prerequisite_id
+""").bindparams(
+    bindparam("word_ids", type_=ARRAY(UUID(as_uuid=True))),
+    bindparam("prerequisite_ids", type_=ARRAY(UUID(as_uuid=True))),
+)
+
+
+async def update_words(db: AsyncSession, domain_id: uuid.UUID, items: list[WordBatchUpdateItem]) -> None:
+    """Apply a batch of word edits to a domain in a few set-based statements.
+
+    Scalar fields go through one UPDATE ... FROM unnest, translations
+    through one upsert on (word_id, language), removed edges through one
+    DELETE with a single closure recompute. Added edges take one cycle
+    check, one INSERT and one closure update (PrerequisiteCycleError). The
+    content version is bumped once. Word and prerequisite ids must have
+    been validated.
+    """
+    now = datetime.utcnow()
+    scalar_items = [
+        item for item in items
+        if item.difficulty is not None or item.sort_order is not None or "image_url" in item.model_fields_set
+    ]
+    if scalar_items:
+        await db.execute(_UPDATE_WORDS_SQL, {
+            "ids": [item.id for item in scalar_items],
+            "difficulties": [item.difficulty for item in scalar_items],
+            "image_urls": [item.image_url for item in scalar_items],
+            "set_image_urls": ["image_url" in item.model_fields_set for item in scalar_items],
+            "sort_orders": [item.sort_order for item in scalar_items],
+            "now": now,
+            "domain_id": domain_id,
+        })
+
+    # Later entries for the same (word, language) win
+    translations = {}
+    for item in items:
+        for translation in item.translations or []:
+            translations[(item.id, translation.language)] = {
+                "id": uuid.uuid4(),
+                "word_id": item.id,
+                "language": translation.language,
+                "text": translation.text,
+                "text_normalized": normalize_search_text(translation.text),
+                "phonetic": translation.phonetic,
+                "example_sentence": translation.example_sentence,
+                "created_at": now,
+                "updated_at": now,
+            }
+    if translations:
+        stmt = pg_insert(WordTranslation).values(list(translations.values()))
+        await db.execute(stmt.on_conflict_do_update(
+            constraint="uq_word_language",
+            set_={
+                "text": stmt.excluded.text,
+                "text_normalized": stmt.excluded.text_normalized,
+                "phonetic": stmt.excluded.phonetic,
+                "example_sentence": stmt.excluded.example_sentence,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ))
+
+    removals = [(item.id, prereq_id) for item in items for prereq_id in item.remove_prerequisite_ids]
+    if removals:
+        result = await db.execute(_REMOVE_EDGES_SQL, {
+            "word_ids": [word_id for word_id, _ in removals],
+            "prerequisite_ids": [prereq_id for _, prereq_id in removals],
+        })
+        removed = result.all()
+        await record_tombstones(db, domain_id, ContentEntity.PREREQUISITE, [
+            {"entity_id": edge.id, "word_id": edge.word_id, "prerequisite_id": edge.prerequisite_id}
+            for edge in removed
+        ])
+        await recompute_closure(db, list({edge.word_id for edge in removed}))
+
+    await add_prerequisites(db, [
+        (item.id, prereq_id) for item in items for prereq_id in item.add_prerequisite_ids
+    ])
+
+    await mark_domain_changed(db, domain_id)
+
+
+async def delete_words(db: AsyncSession, domain_id: uuid.UUID, word_ids: list[uuid.UUID]) -> None:
+    """Delete a batch of words of a domain, with tombstones for delta sync.
+
+    Translations, edges and progress go with the words through foreign key
+    cascades. Edges from words in other domains are tombstoned under those
+    domains, which are marked changed as well. The closure is recomputed
+    once for every remaining word that depended on a deleted one.
+    """
+    ids = _uuid_array(word_ids)
+
+    dependents_result = await db.execute(
+        select(WordPrerequisiteClosure.descendant_id)
+        .where(WordPrerequisiteClosure.ancestor_id == any_(ids))
+        .distinct()
+    )
+    dependents = set(dependents_result.scalars().all()) - set(word_ids)
+
+    translations_result = await db.execute(
+        select(WordTranslation.id).where(WordTranslation.word_id == any_(ids))
+    )
+    edges_result = await db.execute(
+        select(WordPrerequisite.id, WordPrerequisite.word_id, WordPrerequisite.prerequisite_id, Word.domain_id)
+        .join(Word, Word.id == WordPrerequisite.word_id)
+        .where(or_(WordPrerequisite.word_id == any_(ids), WordPrerequisite.prerequisite_id == any_(ids)))
+    )
+    edges_by_domain = {}
+    for edge in edges_result.all():
+        edges_by_domain.setdefault(edge.domain_id, []).append({
+            "entity_id": edge.id, "word_id": edge.word_id, "prerequisite_id": edge.prerequisite_id
+        })
+
+    await record_tombstones(db, domain_id, ContentEntity.WORD, [{"entity_id": word_id} for word_id in word_ids])
+    await record_tombstones(db, domain_id, ContentEntity.TRANSLATION, [
+        {"entity_id": translation_id} for translation_id in translations_result.scalars().all()
+    ])
+    for edge_domain_id, rows in edges_by_domain.items():
+        await record_tombstones(db, edge_domain_id, ContentEntity.PREREQUISITE, rows)
+
+    await db.execute(
+        delete(Word)
+        .where(Word.id == any_(ids), Word.domain_id == domain_id)
+        .execution_options(synchronize_session=False)
+    )
+    await recompute_closure(db, list(dependents))
+
+    await mark_domain_changed(db, domain_id)
+    for edge_domain_id in edges_by_domain.keys() - {domain_id}:
+        await mark_domain_changed(db, edge_domain_id)
+
+
+# Cloning runs in the database: a temporary table maps every source word to
+# a fresh id, and each table is copied with one INSERT ... SELECT through it.
+# Prerequisites outside the source domain keep pointing at the original word.
+_CREATE_WORD_ID_MAP = text("""
+CREATE TEMPORARY TABLE word_id_map (
+    old_id uuid PRIMARY KEY,
+    new_id uuid NOT NULL
+) ON COMMIT DROP
+""")
+
+_MAP_WORD_IDS = text("""
+INSERT INTO word_id_map (old_id, new_id)
+SELECT id, gen_random_uuid() FROM words WHERE domain_id = :source_id
+RETURNING new_id
+""").bindparams(bindparam("source_id", type_=UUID(as_uuid=True)))
+
+_CLONE_WORDS = text("""
+INSERT INTO words (id, domain_id, difficulty, image_url, audio_url, sort_order, is_active, created_at, updated_at)
+SELECT m.new_id, :target_id, w.difficulty, w.image_url, w.audio_url, w.sort_order, w.is_active, :now, :now
+FROM words w
+JOIN word_id_map m ON m.old_id = w.id
+""").bindparams(bindparam("target_id", type_=UUID(as_uuid=True)))
+
+_CLONE_TRANSLATIONS = text("""
+INSERT INTO word_translations (id, word_id, language, text, text_normalized, phonetic, example_sentence, created_at, updated_at)
+SELECT gen_random_uuid(), m.new_id, t.language, t.text, t.text_normalized, t.phonetic, t.example_sentence, :now, :now
+FROM word_translations t
+JOIN word_id_map m ON m.old_id = t.word_id
+""")
+
+_CLONE_EDGES = text("""
+INSERT INTO word_prerequisites (id, word_id, prerequisite_id, created_at)
+SELECT gen_random_uuid(), m.new_id, COALESCE(pm.new_id, p.prerequisite_id), :now
+FROM word_prerequisites p
+JOIN word_id_map m ON m.old_id = p.word_id
+LEFT JOIN word_id_map pm ON pm.old_id = p.prerequisite_id
+""")
+
+_HAS_OUTSIDE_EDGES = text("""
+SELECT EXISTS (
+    SELECT 1
+    FROM word_prerequisites p
+    JOIN word_id_map m ON m.old_id = p.word_id
+    LEFT JOIN word_id_map pm ON pm.old_id = p.prerequisite_id
+    WHERE pm.old_id IS NULL
+)
+""")
+
+_CLONE_CLOSURE = text("""
+INSERT INTO word_prerequisite_closure (ancestor_id, descendant_id, distance)
+SELECT a.new_id, d.new_id, c.distance
+FROM word_prerequisite_closure c
+JOIN word_id_map d ON d.old_id = c.descendant_id
+JOIN word_id_map a ON a.old_id = c.ancestor_id
+""")
+
+
+async def clone_domain(
+    db: AsyncSession,
+    source: Domain,
+    user_id: uuid.UUID,
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    icon: Optional[str] = None,
+    color: Optional[str] = None,
+) -> tuple[Domain, int]:
+    """Copy a domain's words, translations and edges into a new domain of the user.
+
+    Returns the new domain and its word count. Progress is not copied.
+    """
+    clone = Domain(
+        user_id=user_id,
+        name=name or f"{source.name} (copy)"[:100],
+        description=description if description is not None else source.description,
+        icon=icon if icon is not None else source.icon,
+        color=color if color is not None else source.color,
+        is_system=False
+    )
+    db.add(clone)
+    await db.flush()
+
+    now = datetime.utcnow()
+    # Edges and closure rows must be read from the same state of the graph
+    await lock_closure(db)
+    await db.execute(_CREATE_WORD_ID_MAP)
+    mapped = await db.execute(_MAP_WORD_IDS, {"source_id": source.id})
+    new_ids = list(mapped.scalars().all())
+    await db.execute(_CLONE_WORDS, {"target_id": clone.id, "now": now})
+    await db.execute(_CLONE_TRANSLATIONS, {"now": now})
+    await db.execute(_CLONE_EDGES, {"now": now})
+
+    # A self-contained domain's paths all stay inside it, so its closure rows
+    # carry over with the ids swapped. Once an edge leaves the domain, a path
+    # may come back through it to an original word, so recompute instead.
+    if (await db.execute(_HAS_OUTSIDE_EDGES)).scalar():
+        await recompute_closure(db, new_ids)
+    else:
+        await db.execute(_CLONE_CLOSURE)
+    return clone, len(new_ids)
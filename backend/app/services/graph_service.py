@@ -0,0 +1,583 @@
+import uuid
+from typing import Iterable, NamedTuple, Optional
+from sqlalchemy import select, and_, text, bindparam, String, Boolean, any_, cast
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CacheKey
+from app.core.constants import DEFAULT_LANGUAGE, ProgressStatus
+from app.models.domain import Domain
+from app.models.progress import Progress
+from app.models.word import Word, WordPrerequisite
+from app.services.cache_service import content_cache, cache_generation, store_if_current, cached
+from app.services.language_service import project_translations, load_translations
+
+
+def _language_variant(languages: Optional[list[str]]):
+    return tuple(languages) if languages is not None else None
+
+
+def compute_levels(word_ids: Iterable, edges: list) -> dict:
+    """Depth of every word: 0 for roots, else one more than its deepest prerequisite."""
+    depth_map = {word_id: 0 for word_id in word_ids}
+
+    changed = True
+    iterations = 0
+    while changed and iterations < len(depth_map) + 1:
+        changed = False
+        iterations += 1
+        for word_id, prereq_id in edges:
+            if depth_map.get(prereq_id, 0) + 1 > depth_map.get(word_id, 0):
+                depth_map[word_id] = depth_map.get(prereq_id, 0) + 1
+                changed = True
+    return depth_map
+
+
+def build_words_payload(words: list, edges: list, languages: Optional[list[str]]) -> list[dict]:
+    """Word list response from word and translation objects plus (word_id, prerequisite_id) edges."""
+    prereq_map = {}
+    for word_id, prereq_id in edges:
+        prereq_map.setdefault(word_id, []).append(prereq_id)
+
+    return [
+        {
+            "id": w.id,
+            "domain_id": w.domain_id,
+            "difficulty": w.difficulty,
+            "image_url": w.image_url,
+            "sort_order": w.sort_order,
+            "translations": [
+                {
+                    "id": t.id,
+                    "language": t.language,
+                    "text": t.text,
+                    "phonetic": t.phonetic,
+                    "example_sentence": t.example_sentence
+                }
+                for t in project_translations(w.translations, languages)
+            ],
+            "prerequisite_ids": prereq_map.get(w.id, []),
+            "created_at": w.created_at
+        }
+        for w in words
+    ]
+
+
+def build_graph_payload(
+    domain_id: uuid.UUID,
+    words: list,
+    edges: list,
+    languages: Optional[list[str]],
+    depth_map: Optional[dict] = None,
+) -> dict:
+    """Graph response without the domain name; levels are computed unless given."""
+    nodes = []
+    for w in words:
+        translations_dict = {
+            t.language: t.text for t in project_translations(w.translations, languages)
+        }
+        nodes.append({
+            "id": str(w.id),
+            "domain_id": str(w.domain_id),
+            "difficulty": w.difficulty,
+            "image_url": w.image_url,
+            "translations": translations_dict,
+            "sort_order": w.sort_order
+        })
+
+    if depth_map is None:
+        depth_map = compute_levels([w.id for w in words], edges)
+
+    # Group by depth
+    levels = {}
+    for word_id, depth in depth_map.items():
+        levels.setdefault(depth, []).append(str(word_id))
+
+    return {
+        "domain_id": str(domain_id),
+        "nodes": nodes,
+        "edges": [
+            {"from": str(prereq_id), "to": str(word_id)}
+            for word_id, prereq_id in edges
+        ],
+        "levels": [levels.get(d, []) for d in range(max(levels, default=-1) + 1)]
+    }
+
+
+# The database path renders the whole response as JSON in one statement.
+# The access predicate is part of it, so an inaccessible domain returns no row.
+# Translations are narrowed the same way as project_translations: the
+# requested languages in request order, else the fallback language.
+_ACCESSIBLE_DOMAIN = """
+    domain AS (
+        SELECT d.id, d.name FROM domains d
+        WHERE d.id = :domain_id AND (d.user_id = :user_id OR d.is_system)
+    )
+"""
+
+_TRANSLATION_FILTER = """
+    t.word_id = w.id
+    AND (
+        :langs IS NULL
+        OR t.language = ANY(:langs)
+        OR (
+            t.language = :fallback
+            AND NOT EXISTS (
+                SELECT 1 FROM word_translations r
+                WHERE r.word_id = w.id AND r.language = ANY(:langs)
+            )
+        )
+    )
+"""
+
+_TRANSLATION_ORDER = "array_position(:langs, t.language::varchar), t.created_at"
+
+WORDS_JSON_SQL = f"""
+WITH {_ACCESSIBLE_DOMAIN}
+SELECT COALESCE(
+    json_agg(
+        json_build_object(
+            'id', w.id,
+            'domain_id', w.domain_id,
+            'difficulty', w.difficulty,
+            'image_url', w.image_url,
+            'sort_order', w.sort_order,
+            'translations', COALESCE(tr.items, '[]'::json),
+            'prerequisite_ids', COALESCE(pr.items, '[]'::json),
+            'created_at', to_char(w.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+        )
+        ORDER BY w.sort_order
+    ) FILTER (WHERE w.id IS NOT NULL),
+    '[]'::json
+)::text
+FROM domain
+LEFT JOIN words w ON w.domain_id = domain.id
+LEFT JOIN LATERAL (
+    SELECT json_agg(
+        json_build_object(
+            'id', t.id,
+            'language', t.language,
+            'text', t.text,
+            'phonetic', t.phonetic,
+            'example_sentence', t.example_sentence
+        )
+        ORDER BY {_TRANSLATION_ORDER}
+    ) AS items
+    FROM word_translations t
+    WHERE {_TRANSLATION_FILTER}
+) tr ON true
+LEFT JOIN LATERAL (
+    SELECT json_agg(p.prerequisite_id) AS items
+    FROM word_prerequisites p
+    WHERE p.word_id = w.id
+) pr ON true
+GROUP BY domain.id
+"""
+
+# Progress of one child, left-joined onto the nodes of GRAPH_PROGRESS_JSON_SQL.
+# Statuses are stored by enum name, so they are lower-cased for the response.
+_CHILD_PROGRESS = """
+    child_progress AS (
+        SELECT p.word_id, lower(p.status::text) AS status, p.attempts,
+               CASE WHEN p.attempts > 0 THEN round(p.correct_count::numeric / p.attempts, 2) ELSE 0 END AS accuracy,
+               to_char(p.last_practiced_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS last_practiced_at
+        FROM progress p
+        JOIN domain_words w ON w.id = p.word_id
+        WHERE p.child_id = :child_id
+    ),
+"""
+
+_PROGRESS_FIELDS = """,
+                'status', cp.status,
+                'accuracy', cp.accuracy,
+                'last_practiced_at', cp.last_practiced_at"""
+
+_PROGRESS_JOIN = """
+        LEFT JOIN child_progress cp ON cp.word_id = w.id"""
+
+_LEVEL_COUNTS = """,
+    'level_counts', CASE WHEN :level_counts THEN COALESCE((
+        SELECT json_agg(
+            json_build_object('level', c.depth, 'total', c.total, 'mastered', c.mastered, 'started', c.started)
+            ORDER BY c.depth
+        )
+        FROM (
+            SELECT l.depth,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE cp.status = 'mastered') AS mastered,
+                   count(*) FILTER (WHERE cp.status <> 'mastered' AND cp.attempts > 0) AS started
+            FROM levels l
+            LEFT JOIN child_progress cp ON cp.word_id = l.id
+            GROUP BY l.depth
+        ) c
+    ), '[]'::json) END"""
+
+
+def _graph_json_sql(with_progress: bool) -> str:
+    # Levels follow compute_levels: a word sits one level below its deepest
+    # prerequisite. UNION keeps one row per (word, depth), and the depth bound
+    # stops the recursion if the edges ever contain a cycle.
+    return f"""
+WITH RECURSIVE {_ACCESSIBLE_DOMAIN},
+domain_words AS (
+    SELECT w.* FROM words w JOIN domain ON w.domain_id = domain.id
+),
+{_CHILD_PROGRESS if with_progress else ""}
+edges AS (
+    SELECT p.word_id, p.prerequisite_id
+    FROM word_prerequisites p
+    JOIN domain_words w ON w.id = p.word_id
+),
+depths(word_id, depth) AS (
+    SELECT w.id, 0 FROM domain_words w
+    UNION
+    SELECT e.prerequisite_id, 0 FROM edges e
+    UNION
+    SELECT e.word_id, d.depth + 1
+    FROM depths d
+    JOIN edges e ON e.prerequisite_id = d.word_id
+    WHERE d.depth < (SELECT count(*) FROM domain_words)
+),
+levels AS (
+    SELECT w.id, w.sort_order, max(d.depth) AS depth
+    FROM domain_words w
+    JOIN depths d ON d.word_id = w.id
+    GROUP BY w.id, w.sort_order
+)
+SELECT json_build_object(
+    'domain_id', domain.id,
+    'domain_name', domain.name,
+    'nodes', COALESCE((
+        SELECT json_agg(
+            json_build_object(
+                'id', w.id,
+                'domain_id', w.domain_id,
+                'difficulty', w.difficulty,
+                'image_url', w.image_url,
+                'translations', COALESCE(tr.items, '{{}}'::json),
+                'sort_order', w.sort_order{_PROGRESS_FIELDS if with_progress else ""}
+            )
+            ORDER BY w.sort_order
+        )
+        FROM domain_words w
+        LEFT JOIN LATERAL (
+            SELECT json_object_agg(t.language, t.text ORDER BY {_TRANSLATION_ORDER}) AS items
+            FROM word_translations t
+            WHERE {_TRANSLATION_FILTER}
+        ) tr ON true{_PROGRESS_JOIN if with_progress else ""}
+    ), '[]'::json),
+    'edges', COALESCE((
+        SELECT json_agg(json_build_object('from', e.prerequisite_id, 'to', e.word_id))
+        FROM edges e
+    ), '[]'::json),
+    'levels', COALESCE((
+        SELECT json_agg(level.ids ORDER BY level.depth)
+        FROM (
+            SELECT depth, json_agg(id ORDER BY sort_order) AS ids
+            FROM levels
+            GROUP BY depth
+        ) level
+    ), '[]'::json){_LEVEL_COUNTS if with_progress else ""}
+)::text
+FROM domain
+"""
+
+
+GRAPH_JSON_SQL = _graph_json_sql(with_progress=False)
+
+# Graph with one child's status, accuracy and last practice on every node
+GRAPH_PROGRESS_JSON_SQL = _graph_json_sql(with_progress=True)
+
+
+def _json_statement(sql: str):
+    return text(sql).bindparams(
+        bindparam("domain_id", type_=UUID(as_uuid=True)),
+        bindparam("user_id", type_=UUID(as_uuid=True)),
+        bindparam("langs", type_=ARRAY(String)),
+        bindparam("fallback", type_=String),
+    )
+
+
+_WORDS_JSON = _json_statement(WORDS_JSON_SQL)
+_GRAPH_JSON = _json_statement(GRAPH_JSON_SQL)
+_GRAPH_PROGRESS_JSON = _json_statement(GRAPH_PROGRESS_JSON_SQL).bindparams(
+    bindparam("child_id", type_=UUID(as_uuid=True)),
+    bindparam("level_counts", type_=Boolean),
+)
+
+
+async def _render_json(
+    db: AsyncSession,
+    key: CacheKey,
+    statement,
+    domain_id: uuid.UUID,
+    user_id: uuid.UUID,
+    languages: Optional[list[str]],
+) -> Optional[bytes]:
+    payload = content_cache.get(key)
+    if payload is not None:
+        # Cached bytes are shared by every user who can read the domain
+        access = await db.execute(
+            select(Domain.id).where(
+                (Domain.id == domain_id) &
+                ((Domain.user_id == user_id) | (Domain.is_system == True))
+            )
+        )
+        return payload if access.scalar_one_or_none() is not None else None
+
+    generation = cache_generation(domain_id)
+    result = await db.execute(statement, {
+        "domain_id": domain_id,
+        "user_id": user_id,
+        "langs": languages,
+        "fallback": DEFAULT_LANGUAGE.value,
+    })
+    rendered = result.scalar_one_or_none()
+    if rendered is None:
+        return None
+
+    payload = rendered.encode()
+    store_if_current(key, payload, domain_id, generation)
+    return payload
+
+
+async def render_domain_words(
+    db: AsyncSession,
+    domain_id: uuid.UUID,
+    user_id: uuid.UUID,
+    languages: Optional[list[str]] = None,
+) -> Optional[bytes]:
+    """JSON word list of a domain the user can read, or None.
+
+    Rendered by Postgres in a single statement, with no ORM objects built.
+    """
+    key = CacheKey("words", domain_id, _language_variant(languages))
+    return await _render_json(db, key, _WORDS_JSON, domain_id, user_id, languages)
+
+
+async def render_domain_graph(
+    db: AsyncSession,
+    domain_id: uuid.UUID,
+    user_id: uuid.UUID,
+    languages: Optional[list[str]] = None,
+) -> Optional[bytes]:
+    """JSON learning graph (nodes, edges, levels) of a domain the user can read, or None."""
+    key = CacheKey("graph", domain_id, _language_variant(languages))
+    return await _render_json(db, key, _GRAPH_JSON, domain_id, user_id, languages)
+
+
+async def render_child_graph(
+    db: AsyncSession,
+    domain_id: uuid.UUID,
+    user_id: uuid.UUID,
+    child_id: uuid.UUID,
+    languages: Optional[list[str]] = None,
+    level_counts: bool = False,
+) -> Optional[bytes]:
+    """JSON learning graph with a child's progress on every node, or None.
+
+    One statement left-joins the child's progress onto the nodes; with
+    ``level_counts`` it also counts words per level. Not cached, since it
+    changes with every attempt.
+    """
+    result = await db.execute(_GRAPH_PROGRESS_JSON, {
+        "domain_id": domain_id,
+        "user_id": user_id,
+        "langs": languages,
+        "fallback": DEFAULT_LANGUAGE.value,
+        "child_id": child_id,
+        "level_counts": level_counts,
+    })
+    rendered = result.scalar_one_or_none()
+    return rendered.encode() if rendered is not None else None
+
+
+class GraphStructure(NamedTuple):
+    """Levels and in-domain adjacency of a domain's words, without content."""
+    levels: dict        # word_id -> level
+    sort_order: dict    # word_id -> sort_order
+    prerequisites: dict  # word_id -> prerequisite ids in the domain
+    dependents: dict     # word_id -> dependent ids in the domain
+
+
+async def get_graph_structure(db: AsyncSession, domain_id: uuid.UUID, content_version: int) -> GraphStructure:
+    """Structure of a domain's graph, cached per content version.
+
+    Built from two indexed scans (the domain's word ids and their edges),
+    so subgraph queries never load word content they do not return.
+    """
+    async def load():
+        words_result = await db.execute(
+            select(Word.id, Word.sort_order).where(Word.domain_id == domain_id)
+        )
+        sort_order = dict(words_result.all())
+        edges_result = await db.execute(
+            select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
+            .join(Word, Word.id == WordPrerequisite.word_id)
+            .where(Word.domain_id == domain_id)
+        )
+        edges = edges_result.all()
+
+        prerequisites, dependents = {}, {}
+        for word_id, prereq_id in edges:
+            if prereq_id in sort_order:
+                prerequisites.setdefault(word_id, []).append(prereq_id)
+                dependents.setdefault(prereq_id, []).append(word_id)
+        return GraphStructure(compute_levels(sort_order, edges), sort_order, prerequisites, dependents)
+
+    return await cached(CacheKey("structure", domain_id, content_version), load, domain_id)
+
+
+def _neighbourhood(structure: GraphStructure, center_id: uuid.UUID, hops: int) -> dict:
+    """Distance of every word within ``hops`` prerequisite or dependent steps of the center.
+
+    One breadth-first walk over edges in both directions, so paths may mix
+    them: siblings sharing a prerequisite are two steps apart.
+    """
+    distances = {center_id: 0}
+    frontier = [center_id]
+    for distance in range(1, hops + 1):
+        next_frontier = []
+        for word_id in frontier:
+            for adjacency in (structure.prerequisites, structure.dependents):
+                for neighbour in adjacency.get(word_id, ()):
+                    if neighbour not in distances:
+                        distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+        frontier = next_frontier
+    return distances
+
+
+async def get_domain_subgraph(
+    db: AsyncSession,
+    domain: Domain,
+    languages: Optional[list[str]] = None,
+    center_word_id: Optional[uuid.UUID] = None,
+    hops: int = 2,
+    min_level: Optional[int] = None,
+    max_level: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+    child_id: Optional[uuid.UUID] = None,
+    level_counts: bool = False,
+) -> Optional[dict]:
+    """Part of a domain's graph: a neighbourhood, a window of levels, or both.
+
+    Words are ranked by distance from the center (if any), then level and
+    sort order. At most ``max_nodes`` of them are kept. Nodes with edges to
+    words left out are listed in ``boundary`` with the number of hidden
+    prerequisites and dependents. With ``child_id`` the nodes carry that
+    child's progress, as in ``render_child_graph``. Returns None if the
+    center word is not in the domain.
+    """
+    structure = await get_graph_structure(db, domain.id, domain.content_version)
+    levels = structure.levels
+
+    if center_word_id is not None:
+        if center_word_id not in levels:
+            return None
+        distances = _neighbourhood(structure, center_word_id, hops)
+    else:
+        distances = dict.fromkeys(levels, 0)
+
+    selected = [
+        word_id for word_id in distances
+        if (min_level is None or levels[word_id] >= min_level)
+        and (max_level is None or levels[word_id] <= max_level)
+    ]
+    selected.sort(key=lambda w: (distances[w], levels[w], structure.sort_order[w] or 0, str(w)))
+    truncated = max_nodes is not None and len(selected) > max_nodes
+    if truncated:
+        selected = selected[:max_nodes]
+    included = set(selected)
+
+    words_query = (
+        select(Word.id, Word.domain_id, Word.difficulty, Word.image_url, Word.sort_order)
+        .where(Word.id == any_(cast(selected, ARRAY(UUID(as_uuid=True)))))
+        .order_by(Word.sort_order)
+    )
+    if child_id is not None:
+        words_query = words_query.add_columns(
+            Progress.status, Progress.attempts, Progress.correct_count, Progress.last_practiced_at
+        ).outerjoin(Progress, and_(Progress.word_id == Word.id, Progress.child_id == child_id))
+    words_result = await db.execute(words_query)
+    words = words_result.all()
+    translations = await load_translations(db, selected, languages)
+
+    by_level = {}
+    for word in words:
+        by_level.setdefault(levels[word.id], []).append(str(word.id))
+    first_level = min(by_level, default=0)
+
+    boundary = []
+    for word_id in selected:
+        hidden_prerequisites = sum(1 for p in structure.prerequisites.get(word_id, ()) if p not in included)
+        hidden_dependents = sum(1 for d in structure.dependents.get(word_id, ()) if d not in included)
+        if hidden_prerequisites or hidden_dependents:
+            boundary.append({
+                "id": str(word_id),
+                "hidden_prerequisites": hidden_prerequisites,
+                "hidden_dependents": hidden_dependents,
+            })
+
+    nodes = []
+    for w in words:
+        node = {
+            "id": str(w.id),
+            "domain_id": str(w.domain_id),
+            "difficulty": w.difficulty,
+            "image_url": w.image_url,
+            "translations": {
+                t.language: t.text
+                for t in project_translations(translations.get(w.id, []), languages)
+            },
+            "sort_order": w.sort_order
+        }
+        if child_id is not None:
+            node.update(_node_progress(w))
+        nodes.append(node)
+
+    graph = {
+        "domain_id": str(domain.id),
+        "domain_name": domain.name,
+        "nodes": nodes,
+        "edges": [
+            {"from": str(prereq_id), "to": str(word_id)}
+            for word_id in selected
+            for prereq_id in structure.prerequisites.get(word_id, ())
+            if prereq_id in included
+        ],
+        "first_level": first_level,
+        "levels": [by_level.get(d, []) for d in range(first_level, max(by_level, default=-1) + 1)],
+        "boundary": boundary,
+        "total_nodes": len(levels),
+        "truncated": truncated,
+    }
+    if child_id is not None:
+        graph["level_counts"] = _level_counts(words, levels) if level_counts else None
+    return graph
+
+
+def _node_progress(row) -> dict:
+    if row.status is None:
+        return {"status": None, "accuracy": None, "last_practiced_at": None}
+    return {
+        "status": row.status.value,
+        "accuracy": round(row.correct_count / row.attempts, 2) if row.attempts else 0,
+        "last_practiced_at": (
+            row.last_practiced_at.isoformat(timespec="microseconds") if row.last_practiced_at else None
+        ),
+    }
+
+
+def _level_counts(words: list, levels: dict) -> list[dict]:
+    """Words per level, and how many of them the child mastered or started."""
+    counts = {}
+    for w in words:
+        level = levels[w.id]
+        entry = counts.setdefault(level, {"level": level, "total": 0, "mastered": 0, "started": 0})
+        entry["total"] += 1
+        if w.status == ProgressStatus.MASTERED:
+            entry["mastered"] += 1
+        elif w.status is not None and w.attempts:
+            entry["started"] += 1
+    return [counts[level] for level in sorted(counts)]
@@ -0,0 +1,117 @@
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.user import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+
+# Set on responses served from the store instead of running the request again
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotentRequest(NamedTuple):
+    key: str
+    request_hash: str
+
+
+def fingerprint(method: str, path: str, body: bytes) -> str:
+    """Hash telling a retry apart from a different request that reuses its key."""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+async def claim_idempotency_key(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    request: IdempotentRequest,
+) -> Optional[Response]:
+    """Reserve the key in the current transaction, or return the stored response.
+
+    Returns None when the caller should run the request and then call
+    ``store_idempotent_response`` before committing. The claim and the
+    response commit together with the write, and a rollback frees the key
+    again. A retry racing the first request waits on the row lock until
+    that transaction ends, then replays its response.
+    """
+    now = datetime.utcnow()
+    stmt = insert(IdempotencyKey).values(
+        user_id=user_id,
+        key=request.key,
+        request_hash=request.request_hash,
+        expires_at=now + timedelta(hours=settings.idempotency_key_ttl_hours),
+    )
+    # An expired key is taken over as if it were new
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status_code": None,
+            "response_body": None,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at <= now
+    ).returning(IdempotencyKey.key)
+    claimed = await db.execute(stmt)
+    if claimed.first() is not None:
+        return None
+
+    result = await db.execute(
+        select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == request.key)
+    )
+    stored = result.one()
+    if stored.request_hash != request.request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    if stored.status_code is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
+        )
+    return Response(
+        content=stored.response_body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"}
+    )
+
+
+async def store_idempotent_response(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    request: IdempotentRequest,
+    content,
+    status_code: int = status.HTTP_200_OK,
+) -> None:
+    """Save the response of a claimed request; call it before the commit."""
+    body = JSONResponse(content=jsonable_encoder(content)).body
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == request.key)
+        .values(status_code=status_code, response_body=body)
+    )
+
+
+async def purge_idempotency_keys() -> int:
+    """Delete expired keys. Returns how many were removed."""
+    async with async_session() as db:
+        result = await db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())
+        )
+        await db.commit()
+    return result.rowcount
@@ -0,0 +1,75 @@
+import uuid
+from typing import Optional, Iterable
+from sqlalchemy import select, any_, cast
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.constants import DEFAULT_LANGUAGE
+from app.models.word import Word, WordTranslation
+
+
+def parse_languages(lang: Optional[str], default: Optional[str] = None) -> Optional[list[str]]:
+    """Turn a ``lang=pl,en`` query value into an ordered list of language codes.
+
+    Returns None when no language was asked for or ``lang=*`` was sent,
+    meaning every translation.
+    """
+    value = lang or default
+    if not value or value.strip() == "*":
+        return None
+
+    languages = []
+    for code in value.split(","):
+        code = code.strip().lower()
+        if code and code not in languages:
+            languages.append(code)
+    return languages or None
+
+
+def translation_filter(languages: list[str]):
+    """SQL criterion loading the requested languages plus the fallback."""
+    return WordTranslation.language.in_(languages + [DEFAULT_LANGUAGE.value])
+
+
+def translations_loader(languages: Optional[list[str]]):
+    """Loader option for ``Word.translations`` filtered in SQL by language."""
+    if languages is None:
+        return selectinload(Word.translations)
+    return selectinload(Word.translations.and_(translation_filter(languages)))
+
+
+def project_translations(translations: Iterable, languages: Optional[list[str]]) -> list:
+    """Keep the requested translations, falling back to the default language."""
+    translations = list(translations)
+    if languages is None:
+        return translations
+
+    by_language = {t.language: t for t in translations}
+    selected = [by_language[code] for code in languages if code in by_language]
+    if not selected and DEFAULT_LANGUAGE.value in by_language:
+        selected = [by_language[DEFAULT_LANGUAGE.value]]
+    return selected
+
+
+async def load_translations(
+    db: AsyncSession,
+    word_ids: list[uuid.UUID],
+    languages: Optional[list[str]],
+) -> dict:
+    """Translations (word_id, language, text) of many words, grouped by word.
+
+    Narrowed in SQL like ``translations_loader``; pass each group through
+    ``project_translations``.
+    """
+    query = select(
+        WordTranslation.word_id, WordTranslation.language, WordTranslation.text
+    ).where(WordTranslation.word_id == any_(cast(word_ids, ARRAY(UUID(as_uuid=True)))))
+    if languages is not None:
+        query = query.where(translation_filter(languages))
+
+    result = await db.execute(query)
+    translations = {}
+    for t in result.all():
+        translations.setdefault(t.word_id, []).append(t)
+    return translations
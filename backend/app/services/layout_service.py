@@ -0,0 +1,221 @@
+import uuid
+from typing import Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CacheKey
+from app.database import async_session
+from app.models.domain import Domain
+from app.models.word import Word, WordPrerequisite
+from app.services.cache_service import cached
+from app.services.graph_service import compute_levels
+
+# Same spacing the dashboard used for its level grid
+NODE_SPACING = 200
+LAYER_SPACING = 150
+# Long edges are routed through placeholders that take a quarter of a node's width
+DUMMY_WIDTH = NODE_SPACING / 4
+
+CROSSING_SWEEPS = 8
+COORDINATE_PASSES = 4
+
+
+def _count_crossings(upper: list, lower: list, down: dict) -> int:
+    """Crossings between two adjacent layers, by counting inversions with a Fenwick tree."""
+    position = {node: i for i, node in enumerate(lower)}
+    targets = [position[v] for u in upper for v in sorted(down.get(u, ()), key=position.get)]
+
+    tree = [0] * (len(lower) + 1)
+    crossings = 0
+    for seen, target in enumerate(targets):
+        # Earlier edges that end strictly to the right of this one cross it
+        i, not_right = target + 1, 0
+        while i > 0:
+            not_right += tree[i]
+            i -= i & -i
+        crossings += seen - not_right
+        i = target + 1
+        while i <= len(lower):
+            tree[i] += 1
+            i += i & -i
+    return crossings
+
+
+def _total_crossings(layers: list, down: dict) -> int:
+    return sum(_count_crossings(layers[i], layers[i + 1], down) for i in range(len(layers) - 1))
+
+
+def _sort_by_barycenter(layer: list, neighbours: dict, reference: list) -> list:
+    position = {node: i for i, node in enumerate(reference)}
+
+    def barycenter(item):
+        index, node = item
+        linked = [position[n] for n in neighbours.get(node, ()) if n in position]
+        # Nodes without neighbours on that side keep their place
+        return sum(linked) / len(linked) if linked else index * len(reference) / max(len(layer), 1)
+
+    return [node for _, node in sorted(enumerate(layer), key=barycenter)]
+
+
+def _place_layer(layer: list, desired: dict, width: dict) -> dict:
+    """Coordinates as close to ``desired`` as possible, keeping order and spacing."""
+    xs = {}
+    previous = None
+    for node in layer:
+        x = desired[node]
+        if previous is not None:
+            x = max(x, xs[previous] + (width[previous] + width[node]) / 2)
+        xs[node] = x
+        previous = node
+
+    # Packing only pushes right; shift back so the layer is centred on its targets
+    shift = sum(xs[node] - desired[node] for node in layer) / len(layer) if layer else 0
+    return {node: x - shift for node, x in xs.items()}
+
+
+def layered_layout(
+    node_ids: Iterable,
+    edges: list,
+    levels: dict,
+    sort_order: Optional[dict] = None,
+) -> dict:
+    """Layered (Sugiyama-style) coordinates for a prerequisite graph.
+
+    ``edges`` are (word_id, prerequisite_id) pairs and ``levels`` maps each
+    node to its layer, as from compute_levels. Edges spanning several
+    layers get one placeholder per layer crossed. Barycenter sweeps then
+    reorder the layers and keep the order with the fewest crossings. Last,
+    nodes are pulled towards the mean of their neighbours. Returns
+    ``{node_id: {"x": ..., "y": ...}}`` for the real nodes only.
+    """
+    sort_order = sort_order or {}
+    node_ids = sorted(node_ids, key=lambda n: (levels.get(n, 0), sort_order.get(n) or 0, str(n)))
+    if not node_ids:
+        return {}
+
+    depth = max(levels.get(n, 0) for n in node_ids)
+    layers = [[] for _ in range(depth + 1)]
+    layer_of = {}
+    width = {}
+    for node in node_ids:
+        layer_of[node] = levels.get(node, 0)
+        layers[layer_of[node]].append(node)
+        width[node] = NODE_SPACING
+
+    down, up = {}, {}
+
+    def link(upper, lower):
+        down.setdefault(upper, []).append(lower)
+        up.setdefault(lower, []).append(upper)
+
+    for word_id, prereq_id in edges:
+        if word_id not in layer_of or prereq_id not in layer_of:
+            continue
+        previous = prereq_id
+        for layer in range(layer_of[prereq_id] + 1, layer_of[word_id]):
+            dummy = ("dummy", prereq_id, word_id, layer)
+            layers[layer].append(dummy)
+            width[dummy] = DUMMY_WIDTH
+            link(previous, dummy)
+            previous = dummy
+        link(previous, word_id)
+
+    best = [list(layer) for layer in layers]
+    best_crossings = _total_crossings(best, down)
+    for _ in range(CROSSING_SWEEPS):
+        if best_crossings == 0:
+            break
+        for i in range(1, len(layers)):
+            layers[i] = _sort_by_barycenter(layers[i], up, layers[i - 1])
+        for i in range(len(layers) - 2, -1, -1):
+            layers[i] = _sort_by_barycenter(layers[i], down, layers[i + 1])
+        crossings = _total_crossings(layers, down)
+        if crossings < best_crossings:
+            best, best_crossings = [list(layer) for layer in layers], crossings
+    layers = best
+
+    xs = {}
+    for layer in layers:
+        xs.update(_place_layer(layer, {node: i * NODE_SPACING for i, node in enumerate(layer)}, width))
+
+    for iteration in range(COORDINATE_PASSES):
+        downward = iteration % 2 == 0
+        order = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+        neighbours = up if downward else down
+        for i in order:
+            desired = {}
+            for node in layers[i]:
+                linked = neighbours.get(node)
+                desired[node] = sum(xs[n] for n in linked) / len(linked) if linked else xs[node]
+            xs.update(_place_layer(layers[i], desired, width))
+
+    left = min(xs[node] for node in node_ids)
+    return {
+        str(node): {"x": round(xs[node] - left), "y": layer_of[node] * LAYER_SPACING}
+        for node in node_ids
+    }
+
+
+async def domain_layout(db: AsyncSession, domain_id: uuid.UUID, content_version: int) -> dict:
+    """Node coordinates of a domain's graph, cached per content version."""
+    async def load():
+        words_result = await db.execute(
+            select(Word.id, Word.sort_order).where(Word.domain_id == domain_id)
+        )
+        sort_order = dict(words_result.all())
+        edges_result = await db.execute(
+            select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
+            .join(Word, Word.id == WordPrerequisite.word_id)
+            .where(Word.domain_id == domain_id)
+        )
+        edges = edges_result.all()
+        return layered_layout(sort_order, edges, compute_levels(sort_order, edges), sort_order)
+
+    return await cached(CacheKey("layout", domain_id, content_version), load, domain_id)
+
+
+async def get_domain_layout(
+    db: AsyncSession,
+    domain_id: uuid.UUID,
+    user_id: uuid.UUID,
+    content_version: Optional[int] = None,
+) -> Optional[dict]:
+    """Node coordinates of a domain's graph, or None if the user cannot read it.
+
+    Cached per content version, so the layout is computed once per change.
+    Pass ``content_version`` when the caller has already loaded the domain,
+    so the layout is keyed to the same version as the rest of its response.
+    """
+    if content_version is None:
+        version_result = await db.execute(
+            select(Domain.content_version).where(
+                (Domain.id == domain_id) &
+                ((Domain.user_id == user_id) | (Domain.is_system == True))
+            )
+        )
+        content_version = version_result.scalar_one_or_none()
+        if content_version is None:
+            return None
+
+    return await domain_layout(db, domain_id, content_version)
+
+
+async def warm_domain_layout(domain_id: uuid.UUID) -> None:
+    """Lay out a changed domain ahead of the next graph request for it."""
+    async with async_session() as db:
+        version_result = await db.execute(
+            select(Domain.content_version).where(Domain.id == domain_id)
+        )
+        content_version = version_result.scalar_one_or_none()
+        if content_version is not None:
+            await domain_layout(db, domain_id, content_version)
+
+
+async def get_snapshot_layout(domain, words: list, edges: list) -> dict:
+    """Node coordinates of a system domain served from the content snapshot."""
+    async def load():
+        return layered_layout(
+            [w.id for w in words], edges, {w.id: w.level for w in words}, {w.id: w.sort_order for w in words}
+        )
+
+    return await cached(CacheKey("layout", domain.id, domain.content_version), load, domain.id)
@@ -0,0 +1,279 @@
+import heapq
+import uuid
+from typing import NamedTuple, Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import CacheKey, LRUCache
+from app.core.constants import ProgressStatus
+from app.models.progress import Progress
+from app.models.word import Word, WordPrerequisite, WordPrerequisiteClosure
+from app.services.cache_service import (
+    DOMAIN_CONTENT,
+    RESET,
+    cache_generation,
+    cached,
+    on_invalidation,
+    publish_invalidation,
+)
+
+# Invalidation kind sent when an attempt changes a child's progress in a domain
+LEARNING_PATH = "path"
+
+# Easier words first, as in next-words
+DIFFICULTY_SCORE = {"beginner": 100, "intermediate": 50, "advanced": 10}
+# Per word that transitively depends on this one
+UNLOCK_WEIGHT = 10
+# Times the child's accuracy on a word they have started
+MASTERY_WEIGHT = 50
+
+path_cache = LRUCache(maxsize=settings.learning_path_cache_size, ttl=settings.learning_path_cache_ttl)
+
+_generations: dict[tuple, int] = {}
+
+
+class PathGraph(NamedTuple):
+    """Prerequisite structure of a domain's active words, shared by every child."""
+    difficulty: dict          # word_id -> difficulty
+    sort_order: dict          # word_id -> sort_order
+    prerequisites: dict       # word_id -> prerequisite ids inside the domain
+    dependents: dict          # word_id -> dependent ids inside the domain
+    impact: dict              # word_id -> number of transitive dependents in the domain
+
+
+class WordState(NamedTuple):
+    status: ProgressStatus
+    attempts: int
+    correct_count: int
+
+
+class LearningPlan:
+    """One child's study sequence in one domain.
+
+    Holds the shared domain graph and the child's progress per word. An
+    attempt patches the state of the words it changed; the order is then
+    derived again in memory on the next read, without touching the database.
+    """
+
+    def __init__(self, graph: PathGraph, states: dict):
+        self.graph = graph
+        self.states = states
+        self.token: Optional[str] = None
+        self._order: Optional[list] = None
+
+    def status(self, word_id: uuid.UUID) -> ProgressStatus:
+        state = self.states.get(word_id)
+        if state is not None:
+            return state.status
+        if self.graph.prerequisites.get(word_id):
+            return ProgressStatus.LOCKED
+        return ProgressStatus.UNLOCKED
+
+    def score(self, word_id: uuid.UUID) -> int:
+        score = DIFFICULTY_SCORE.get(self.graph.difficulty[word_id], 0)
+        score += self.graph.impact.get(word_id, 0) * UNLOCK_WEIGHT
+        state = self.states.get(word_id)
+        if state is not None and state.attempts:
+            score += round(state.correct_count / state.attempts * MASTERY_WEIGHT)
+        return score
+
+    def order(self) -> list:
+        """Unmastered words in topological order, highest score first among the available ones."""
+        if self._order is not None:
+            return self._order
+
+        graph = self.graph
+        pending = {
+            word_id: sum(
+                1 for prereq_id in graph.prerequisites.get(word_id, ())
+                if self.status(prereq_id) != ProgressStatus.MASTERED
+            )
+            for word_id in graph.difficulty
+            if self.status(word_id) != ProgressStatus.MASTERED
+        }
+
+        def entry(word_id):
+            return (-self.score(word_id), graph.sort_order[word_id] or 0, str(word_id), word_id)
+
+        heap = [entry(word_id) for word_id, count in pending.items() if count == 0]
+        heapq.heapify(heap)
+        order = []
+        while heap:
+            word_id = heapq.heappop(heap)[-1]
+            order.append(word_id)
+            for dependent_id in graph.dependents.get(word_id, ()):
+                if dependent_id in pending:
+                    pending[dependent_id] -= 1
+                    if pending[dependent_id] == 0:
+                        heapq.heappush(heap, entry(dependent_id))
+
+        self._order = order
+        return order
+
+    def apply(self, word_id: uuid.UUID, state: WordState, unlocked_ids: list) -> None:
+        """Record an attempt's effect on the word and the dependents it unlocked."""
+        if word_id in self.graph.difficulty:
+            self.states[word_id] = state
+        for unlocked_id in unlocked_ids:
+            if unlocked_id in self.graph.difficulty:
+                previous = self.states.get(unlocked_id)
+                self.states[unlocked_id] = WordState(
+                    ProgressStatus.UNLOCKED,
+                    previous.attempts if previous else 0,
+                    previous.correct_count if previous else 0,
+                )
+        self._order = None
+
+    def ancestors(self, word_id: uuid.UUID) -> set:
+        """The word and everything it depends on inside the domain."""
+        found = {word_id}
+        stack = [word_id]
+        while stack:
+            for prereq_id in self.graph.prerequisites.get(stack.pop(), ()):
+                if prereq_id not in found:
+                    found.add(prereq_id)
+                    stack.append(prereq_id)
+        return found
+
+
+def _plan_key(child_id: uuid.UUID, domain_id: uuid.UUID) -> CacheKey:
+    return CacheKey("path", domain_id, child_id)
+
+
+def _plan_generation(child_id, domain_id) -> tuple:
+    return (_generations.get((str(child_id), str(domain_id)), 0), cache_generation(domain_id))
+
+
+@on_invalidation(LEARNING_PATH)
+def _drop_learning_path(value: Optional[str]) -> None:
+    child_id, domain_id, token = value.split(":")
+    _generations[(child_id, domain_id)] = _generations.get((child_id, domain_id), 0) + 1
+    key = _plan_key(uuid.UUID(child_id), uuid.UUID(domain_id))
+    plan = path_cache.get(key)
+    # The worker that made the change patches its own plan instead
+    if plan is not None and plan.token != token:
+        path_cache.delete(key)
+
+
+@on_invalidation(DOMAIN_CONTENT)
+def _drop_domain_paths(value: Optional[str]) -> None:
+    path_cache.invalidate_tag(value)
+
+
+@on_invalidation(RESET)
+def _drop_all_paths(value: Optional[str]) -> None:
+    _generations.clear()
+    path_cache.clear()
+
+
+async def _load_graph(db: AsyncSession, domain_id: uuid.UUID) -> PathGraph:
+    words_result = await db.execute(
+        select(Word.id, Word.difficulty, Word.sort_order)
+        .where(Word.domain_id == domain_id, Word.is_active == True)
+    )
+    words = words_result.all()
+    difficulty = {w.id: w.difficulty for w in words}
+
+    edges_result = await db.execute(
+        select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
+        .join(Word, Word.id == WordPrerequisite.word_id)
+        .where(Word.domain_id == domain_id)
+    )
+    prerequisites, dependents = {}, {}
+    for word_id, prereq_id in edges_result.all():
+        if word_id in difficulty and prereq_id in difficulty:
+            prerequisites.setdefault(word_id, []).append(prereq_id)
+            dependents.setdefault(prereq_id, []).append(word_id)
+
+    impact_result = await db.execute(
+        select(WordPrerequisiteClosure.ancestor_id, func.count())
+        .join(Word, Word.id == WordPrerequisiteClosure.descendant_id)
+        .where(Word.domain_id == domain_id, Word.is_active == True)
+        .group_by(WordPrerequisiteClosure.ancestor_id)
+    )
+
+    return PathGraph(
+        difficulty=difficulty,
+        sort_order={w.id: w.sort_order for w in words},
+        prerequisites=prerequisites,
+        dependents=dependents,
+        impact=dict(impact_result.all()),
+    )
+
+
+async def get_learning_plan(db: AsyncSession, child_id: uuid.UUID, domain_id: uuid.UUID) -> LearningPlan:
+    """The cached plan of a child in a domain, loading it on a miss."""
+    key = _plan_key(child_id, domain_id)
+    plan = path_cache.get(key)
+    if plan is not None:
+        return plan
+
+    generation = _plan_generation(child_id, domain_id)
+    graph = await cached(
+        CacheKey("path-graph", domain_id), lambda: _load_graph(db, domain_id), domain_id
+    )
+    progress_result = await db.execute(
+        select(Progress.word_id, Progress.status, Progress.attempts, Progress.correct_count)
+        .join(Word, Word.id == Progress.word_id)
+        .where(Progress.child_id == child_id, Word.domain_id == domain_id)
+    )
+    states = {
+        row.word_id: WordState(row.status, row.attempts or 0, row.correct_count or 0)
+        for row in progress_result.all()
+    }
+
+    plan = LearningPlan(graph, states)
+    if _plan_generation(child_id, domain_id) == generation:
+        path_cache.set(key, plan, tags=(str(domain_id),))
+    return plan
+
+
+async def publish_learning_path_change(db: AsyncSession, child_id: uuid.UUID, domain_id: uuid.UUID) -> str:
+    """Tell other workers to drop their copy of the plan once the transaction commits.
+
+    Returns the change token to pass to ``apply_attempt`` after the commit.
+    """
+    token = uuid.uuid4().hex
+    plan = path_cache.get(_plan_key(child_id, domain_id))
+    if plan is not None:
+        plan.token = token
+    await publish_invalidation(db, LEARNING_PATH, f"{child_id}:{domain_id}:{token}")
+    return token
+
+
+def apply_attempt(
+    child_id: uuid.UUID,
+    domain_id: uuid.UUID,
+    word_id: uuid.UUID,
+    state: WordState,
+    unlocked_ids: list,
+    token: str,
+) -> None:
+    """Patch this worker's cached plan after a committed attempt."""
+    plan = path_cache.get(_plan_key(child_id, domain_id))
+    if plan is not None and plan.token == token:
+        plan.apply(word_id, state, unlocked_ids)
+
+
+def plan_steps(plan: LearningPlan, target_word_id: Optional[uuid.UUID] = None) -> list[dict]:
+    """Ordered steps of a plan, optionally only those leading to ``target_word_id``."""
+    order = plan.order()
+    if target_word_id is not None:
+        needed = plan.ancestors(target_word_id)
+        order = [word_id for word_id in order if word_id in needed]
+
+    return [
+        {
+            "step": step,
+            "word_id": word_id,
+            "status": plan.status(word_id),
+            "difficulty": plan.graph.difficulty[word_id],
+            "score": plan.score(word_id),
+            "prerequisite_ids": [
+                prereq_id for prereq_id in plan.graph.prerequisites.get(word_id, [])
+                if plan.status(prereq_id) != ProgressStatus.MASTERED
+            ],
+        }
+        for step, word_id in enumerate(order, start=1)
+    ]
@@ -0,0 +1,112 @@
+import re
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import text
+
+from app.config import get_settings
+
+_MONTH_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+# Held for the rest of the transaction that maintains attempt_events partitions
+_ATTEMPT_EVENT_PARTITIONS_LOCK = text("SELECT pg_advisory_xact_lock(hashtext('attempt_events_partitions'))")
+
+# Tables hash-partitioned on child_id, parents before children
+CHILD_PARTITIONED_TABLES = ("progress", "chat_sessions", "chat_messages")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+async def ensure_monthly_partitions(
+    conn,
+    table: str,
+    months_ahead: int,
+    today: Optional[date] = None,
+) -> list[str]:
+    """Create monthly range partitions from the current month ``months_ahead`` on.
+
+    ``conn`` is an AsyncConnection or AsyncSession. Existing partitions are
+    kept, so this is safe to run on every startup and on a schedule.
+    Returns the partition names that were checked.
+    """
+    current = (today or datetime.utcnow().date()).replace(day=1)
+    names = []
+    for offset in range(months_ahead + 1):
+        start = _add_months(current, offset)
+        end = _add_months(start, 1)
+        name = partition_name(table, start)
+        await conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        names.append(name)
+    return names
+
+
+async def drop_monthly_partitions_before(conn, table: str, cutoff: date) -> list[str]:
+    """Detach and drop monthly partitions that end on or before ``cutoff``.
+
+    Dropping a whole partition is a catalog change, not a row-by-row delete,
+    so expiring old history does not bloat the table or need a vacuum.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table}
+    )
+
+    dropped = []
+    for (name,) in result.all():
+        match = _MONTH_SUFFIX.search(name)
+        if not match:
+            continue
+        month_end = _add_months(date(int(match.group(1)), int(match.group(2)), 1), 1)
+        if month_end <= cutoff:
+            await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            await conn.execute(text(f'DROP TABLE "{name}"'))
+            dropped.append(name)
+    return dropped
+
+
+async def maintain_attempt_event_partitions(conn) -> None:
+    """Create upcoming attempt_events partitions and drop expired ones.
+
+    Workers starting together queue up on an advisory lock instead of
+    racing on the same DDL.
+    """
+    settings = get_settings()
+    await conn.execute(_ATTEMPT_EVENT_PARTITIONS_LOCK)
+    await ensure_monthly_partitions(conn, "attempt_events", settings.attempt_event_months_ahead)
+    cutoff = _add_months(datetime.utcnow().date().replace(day=1), -settings.attempt_event_retention_months)
+    await drop_monthly_partitions_before(conn, "attempt_events", cutoff)
+
+
+def hash_partition_ddl(table: str, partitions: int) -> list[str]:
+    """Statements creating the ``partitions`` hash partitions of ``table``."""
+    return [
+        f'CREATE TABLE IF NOT EXISTS "{table}_p{remainder:02d}" PARTITION OF "{table}" '
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+
+
+async def ensure_child_partitions(conn) -> None:
+    """Create the hash partitions of the per-child tables.
+
+    The partition count is fixed once rows exist: changing
+    ``child_partition_count`` afterwards means repartitioning the tables.
+    """
+    partitions = get_settings().child_partition_count
+    for table in CHILD_PARTITIONED_TABLES:
+        for statement in hash_partition_ddl(table, partitions):
+            await conn.execute(text(statement))
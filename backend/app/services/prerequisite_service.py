@@ -0,0 +1,308 @@
+import uuid
+from typing import Optional
+from sqlalchemy import select, delete, func, and_, or_, any_, cast, text, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.domain import Domain
+from app.models.progress import Progress
+from app.models.word import Word, WordPrerequisite, WordPrerequisiteClosure
+from app.services.language_service import load_translations, project_translations
+
+PREREQUISITES = "prerequisites"
+DEPENDENTS = "dependents"
+
+
+def _uuid_array(ids: list[uuid.UUID]):
+    # One array parameter instead of an IN list with a parameter per id
+    return cast(ids, ARRAY(UUID(as_uuid=True)))
+
+
+# Serialises edge writes, so two transactions cannot each add half of a cycle
+_CLOSURE_LOCK = text("SELECT pg_advisory_xact_lock(hashtext('word_prerequisite_closure'))")
+
+# Every ancestor of the prerequisite (and itself) now reaches every descendant
+# of the word (and itself). Pairs that were already connected keep the shorter
+# distance. The pairs are distinct because the graph has no cycles.
+_LINK_SQL = text("""
+INSERT INTO word_prerequisite_closure (ancestor_id, descendant_id, distance)
+SELECT a.ancestor_id, d.descendant_id, a.distance + d.distance + 1
+FROM (
+    SELECT ancestor_id, distance FROM word_prerequisite_closure WHERE descendant_id = :prerequisite_id
+    UNION ALL SELECT :prerequisite_id, 0
+) a
+CROSS JOIN (
+    SELECT descendant_id, distance FROM word_prerequisite_closure WHERE ancestor_id = :word_id
+    UNION ALL SELECT :word_id, 0
+) d
+ON CONFLICT (ancestor_id, descendant_id)
+DO UPDATE SET distance = LEAST(word_prerequisite_closure.distance, EXCLUDED.distance)
+""").bindparams(
+    bindparam("word_id", type_=UUID(as_uuid=True)),
+    bindparam("prerequisite_id", type_=UUID(as_uuid=True)),
+)
+
+# Recomputes the ancestors of a set of words that is closed under "dependent
+# of". The walk only continues through words in the set; any other ancestor
+# still has correct rows and contributes them directly.
+_RECOMPUTE_SQL = text("""
+WITH RECURSIVE walk(descendant_id, ancestor_id, distance) AS (
+    SELECT p.word_id, p.prerequisite_id, 1
+    FROM word_prerequisites p
+    WHERE p.word_id = ANY(:word_ids)
+    UNION
+    SELECT w.descendant_id, p.prerequisite_id, w.distance + 1
+    FROM walk w
+    JOIN word_prerequisites p ON p.word_id = w.ancestor_id
+    WHERE w.ancestor_id = ANY(:word_ids)
+),
+paths AS (
+    SELECT ancestor_id, descendant_id, distance FROM walk
+    UNION ALL
+    SELECT c.ancestor_id, w.descendant_id, w.distance + c.distance
+    FROM walk w
+    JOIN word_prerequisite_closure c ON c.descendant_id = w.ancestor_id
+    WHERE w.ancestor_id <> ALL(:word_ids)
+)
+INSERT INTO word_prerequisite_closure (ancestor_id, descendant_id, distance)
+SELECT ancestor_id, descendant_id, min(distance)
+FROM paths
+GROUP BY ancestor_id, descendant_id
+""").bindparams(bindparam("word_ids", type_=ARRAY(UUID(as_uuid=True))))
+
+
+# First new edge that would close a cycle, given the closure plus every new
+# edge. Each walk starts at an edge's word and follows closure rows and new
+# edges towards dependents; reaching the edge's prerequisite means the
+# prerequisite already depends on the word. Paths through several new edges
+# of the batch are covered as well.
+_FIRST_CYCLE_SQL = text("""
+WITH RECURSIVE new_edges(word_id, prerequisite_id) AS (
+    SELECT * FROM unnest(:word_ids, :prerequisite_ids)
+),
+steps(from_id, to_id) AS (
+    SELECT ancestor_id, descendant_id FROM word_prerequisite_closure
+    UNION ALL
+    SELECT prerequisite_id, word_id FROM new_edges
+),
+walk(word_id, prerequisite_id, node_id) AS (
+    SELECT word_id, prerequisite_id, word_id FROM new_edges
+    UNION
+    SELECT w.word_id, w.prerequisite_id, s.to_id
+    FROM walk w
+    JOIN steps s ON s.from_id = w.node_id
+)
+SELECT word_id, prerequisite_id FROM walk WHERE node_id = prerequisite_id LIMIT 1
+""").bindparams(
+    bindparam("word_ids", type_=ARRAY(UUID(as_uuid=True))),
+    bindparam("prerequisite_ids", type_=ARRAY(UUID(as_uuid=True))),
+)
+
+
+class PrerequisiteCycleError(Exception):
+    """Raised when a prerequisite edge would make a word depend on itself."""
+
+    def __init__(self, word_id: uuid.UUID, prerequisite_id: uuid.UUID):
+        super().__init__(f"Word {prerequisite_id} already depends on {word_id}")
+        self.word_id = word_id
+        self.prerequisite_id = prerequisite_id
+
+
+async def accessible_word_ids(db: AsyncSession, word_ids: list[uuid.UUID], user_id: uuid.UUID) -> set:
+    """The subset of ``word_ids`` that exist in domains the user can read."""
+    if not word_ids:
+        return set()
+    result = await db.execute(
+        select(Word.id)
+        .join(Domain, Word.domain_id == Domain.id)
+        .where(
+            Word.id == any_(_uuid_array(word_ids)),
+            or_(Domain.user_id == user_id, Domain.is_system == True)
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def add_prerequisites(db: AsyncSession, edges: list[tuple[uuid.UUID, uuid.UUID]]) -> int:
+    """Add many (word_id, prerequisite_id) edges and extend the closure once.
+
+    One query checks every edge for cycles, one INSERT adds the edges and
+    the closure is extended in a single statement for one new edge, or
+    recomputed once for the words that gained edges. Raises
+    PrerequisiteCycleError for the first edge found to close a cycle.
+    Returns the number of edges that did not exist yet.
+    """
+    edges = list(dict.fromkeys(edges))
+    if not edges:
+        return 0
+
+    await db.execute(_CLOSURE_LOCK)
+    params = {
+        "word_ids": [word_id for word_id, _ in edges],
+        "prerequisite_ids": [prereq_id for _, prereq_id in edges],
+    }
+    cycle = (await db.execute(_FIRST_CYCLE_SQL, params)).first()
+    if cycle is not None:
+        raise PrerequisiteCycleError(cycle.word_id, cycle.prerequisite_id)
+
+    result = await db.execute(
+        insert(WordPrerequisite)
+        .values([{"word_id": word_id, "prerequisite_id": prereq_id} for word_id, prereq_id in edges])
+        .on_conflict_do_nothing(constraint="uq_word_prerequisite")
+        .returning(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
+    )
+    added = result.all()
+
+    if len(added) == 1:
+        await db.execute(_LINK_SQL, {"word_id": added[0].word_id, "prerequisite_id": added[0].prerequisite_id})
+    elif added:
+        # Paths may run through several new edges, so rebuild rather than link
+        await recompute_closure(db, list({edge.word_id for edge in added}))
+    return len(added)
+
+
+async def lock_closure(db: AsyncSession) -> None:
+    """Hold off edge writes until the current transaction ends."""
+    await db.execute(_CLOSURE_LOCK)
+
+
+async def recompute_closure(db: AsyncSession, word_ids: list[uuid.UUID]) -> None:
+    """Rebuild the ancestor rows of ``word_ids`` and everything that depends on them."""
+    if not word_ids:
+        return
+    await db.execute(_CLOSURE_LOCK)
+    result = await db.execute(
+        select(WordPrerequisiteClosure.descendant_id)
+        .where(WordPrerequisiteClosure.ancestor_id == any_(_uuid_array(word_ids)))
+    )
+    affected = list(set(word_ids) | set(result.scalars().all()))
+
+    await db.execute(
+        delete(WordPrerequisiteClosure)
+        .where(WordPrerequisiteClosure.descendant_id == any_(_uuid_array(affected)))
+    )
+    await db.execute(_RECOMPUTE_SQL, {"word_ids": affected})
+
+
+async def remove_prerequisite(db: AsyncSession, word_id: uuid.UUID, prerequisite_id: uuid.UUID) -> bool:
+    """Remove a prerequisite edge and shrink the closure. Returns False if there was none."""
+    await db.execute(_CLOSURE_LOCK)
+    result = await db.execute(
+        delete(WordPrerequisite).where(
+            WordPrerequisite.word_id == word_id,
+            WordPrerequisite.prerequisite_id == prerequisite_id
+        )
+    )
+    if result.rowcount == 0:
+        return False
+
+    # Other paths may still connect the same pairs, so recompute rather than subtract
+    await recompute_closure(db, [word_id])
+    return True
+
+
+async def rebuild_prerequisite_closure(db: AsyncSession) -> int:
+    """Recompute the whole closure from word_prerequisites. Returns the row count."""
+    await db.execute(_CLOSURE_LOCK)
+    await db.execute(delete(WordPrerequisiteClosure))
+    result = await db.execute(select(WordPrerequisite.word_id).distinct())
+    await db.execute(_RECOMPUTE_SQL, {"word_ids": list(result.scalars().all())})
+
+    count = await db.execute(select(func.count()).select_from(WordPrerequisiteClosure))
+    return count.scalar()
+
+
+def related_words_query(word_id: uuid.UUID, direction: str, max_depth: int):
+    """(word_id, depth) of every word reachable from ``word_id`` within ``max_depth`` edges.
+
+    A single indexed scan of word_prerequisite_closure: by descendant for
+    prerequisites, by ancestor (the primary key) for dependents. The depth
+    is the shortest chain between the two words.
+    """
+    closure = WordPrerequisiteClosure
+    if direction == PREREQUISITES:
+        query = select(closure.ancestor_id.label("word_id"), closure.distance.label("depth")).where(
+            closure.descendant_id == word_id
+        )
+    else:
+        query = select(closure.descendant_id.label("word_id"), closure.distance.label("depth")).where(
+            closure.ancestor_id == word_id
+        )
+
+    return query.where(closure.distance <= max_depth).subquery("related_words")
+
+
+async def get_related_words(
+    db: AsyncSession,
+    word_id: uuid.UUID,
+    user_id: uuid.UUID,
+    direction: str,
+    max_depth: int,
+    child_id: Optional[uuid.UUID] = None,
+    languages: Optional[list[str]] = None,
+) -> dict:
+    """Transitive prerequisites or dependents of a word, nearest first.
+
+    Only words in domains the user can read are returned. With ``child_id``
+    each word carries the child's progress status (None when not started).
+    ``edges`` are the prerequisite links among the returned words and the root.
+    """
+    related = related_words_query(word_id, direction, max_depth)
+
+    # Plain columns rather than ORM entities; hydration dominates on deep graphs
+    columns = [Word.id, Word.domain_id, Word.difficulty, related.c.depth]
+    if child_id is not None:
+        columns.append(Progress.status)
+
+    query = (
+        select(*columns)
+        .join(related, related.c.word_id == Word.id)
+        .join(Domain, Word.domain_id == Domain.id)
+        .where(or_(Domain.user_id == user_id, Domain.is_system == True))
+        .order_by(related.c.depth, Word.sort_order)
+    )
+    if child_id is not None:
+        query = query.outerjoin(
+            Progress,
+            and_(Progress.word_id == Word.id, Progress.child_id == child_id)
+        )
+
+    result = await db.execute(query)
+    rows = result.all()
+
+    word_ids = [row.id for row in rows]
+    node_ids = [word_id] + word_ids
+
+    translations = await load_translations(db, word_ids, languages)
+
+    edges_result = await db.execute(
+        select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
+        .where(
+            WordPrerequisite.word_id == any_(_uuid_array(node_ids)),
+            WordPrerequisite.prerequisite_id == any_(_uuid_array(node_ids))
+        )
+    )
+
+    return {
+        "word_id": word_id,
+        "direction": direction,
+        "max_depth": max_depth,
+        "words": [
+            {
+                "word_id": row.id,
+                "domain_id": row.domain_id,
+                "depth": row.depth,
+                "difficulty": row.difficulty,
+                "translations": {
+                    t.language: t.text
+                    for t in project_translations(translations.get(row.id, []), languages)
+                },
+                "status": row.status if child_id is not None else None,
+            }
+            for row in rows
+        ],
+        "edges": [
+            {"word_id": edge_word_id, "prerequisite_id": prereq_id}
+            for edge_word_id, prereq_id in edges_result.all()
+        ],
+    }
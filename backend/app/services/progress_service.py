@@ -0,0 +1,361 @@
+import base64
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, and_, or_, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.constants import PROGRESS_STATUS_CODES, ProgressStatus
+from app.models.progress import Progress, Child, DailyActivity, AttemptEvent
+from app.models.word import Word, WordPrerequisite
+
+# Counters are packed as unsigned 16-bit integers and saturate at this value.
+SNAPSHOT_COUNTER_MAX = 0xFFFF
+
+# Longest streak reported; bounds the rollup rows read per streak query.
+STREAK_LOOKBACK_DAYS = 366
+
+
+def _encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _digest(*parts: bytes) -> str:
+    hasher = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        hasher.update(part)
+    return hasher.hexdigest()
+
+
+def _pack_counters(values: list[int]) -> bytes:
+    return b"".join(
+        min(value, SNAPSHOT_COUNTER_MAX).to_bytes(2, "little") for value in values
+    )
+
+
+async def build_progress_snapshot(
+    db: AsyncSession,
+    child_id: uuid.UUID,
+    domain_id: uuid.UUID,
+    include_counters: bool = False,
+    known_words_digest: Optional[str] = None,
+) -> dict:
+    """Pack a child's status on every word of a domain into byte arrays.
+
+    Words come in domain order and position ``i`` of every array refers to
+    the ``i``-th word id. Devices that already hold the word list for
+    ``words_digest`` get the ids left out.
+    """
+    result = await db.execute(
+        select(Word.id, Progress.status, Progress.attempts, Progress.correct_count)
+        .outerjoin(
+            Progress,
+            and_(Progress.word_id == Word.id, Progress.child_id == child_id)
+        )
+        .where(Word.domain_id == domain_id, Word.is_active == True)
+        .order_by(Word.sort_order, Word.id)
+    )
+    rows = result.all()
+
+    word_ids = b"".join(row.id.bytes for row in rows)
+    statuses = bytes(PROGRESS_STATUS_CODES.get(row.status, 0) for row in rows)
+    words_digest = _digest(word_ids)
+
+    snapshot = {
+        "domain_id": domain_id,
+        "child_id": child_id,
+        "word_count": len(rows),
+        "words_digest": words_digest,
+        "word_ids": None if known_words_digest == words_digest else _encode(word_ids),
+        "statuses": _encode(statuses),
+        "attempts": None,
+        "correct_counts": None,
+    }
+
+    if include_counters:
+        attempts = _pack_counters([row.attempts or 0 for row in rows])
+        correct_counts = _pack_counters([row.correct_count or 0 for row in rows])
+        snapshot["attempts"] = _encode(attempts)
+        snapshot["correct_counts"] = _encode(correct_counts)
+        snapshot["digest"] = _digest(word_ids, statuses, attempts, correct_counts)
+    else:
+        snapshot["digest"] = _digest(word_ids, statuses)
+
+    return snapshot
+
+
+async def lock_progress(db: AsyncSession, child_id: uuid.UUID, word_id: uuid.UUID) -> Progress:
+    """Get or create a child's progress row on a word, locked until commit.
+
+    The insert is a no-op when the row exists, so concurrent first attempts
+    and unlocks of the same word cannot collide on uq_child_word. Holding
+    the row lock serialises attempts, so counters are never lost.
+    """
+    now = datetime.utcnow()
+    await db.execute(
+        insert(Progress)
+        .values(
+            id=uuid.uuid4(),
+            child_id=child_id,
+            word_id=word_id,
+            status=ProgressStatus.UNLOCKED,
+            attempts=0,
+            correct_count=0,
+            streak_count=0,
+            created_at=now,
+            updated_at=now,
+        )
+        .on_conflict_do_nothing(constraint="uq_child_word")
+    )
+    result = await db.execute(
+        select(Progress)
+        .where(Progress.child_id == child_id, Progress.word_id == word_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def unlock_dependents(
+    db: AsyncSession,
+    child_id: uuid.UUID,
+    word_id: uuid.UUID,
+) -> list[uuid.UUID]:
+    """Unlock the words whose prerequisites are all mastered once ``word_id`` is.
+
+    One INSERT ... SELECT finds the dependents of the word that have no
+    unmastered prerequisite left and upserts their progress to unlocked.
+    Rows already past LOCKED are left alone. Returns the unlocked word ids.
+    """
+    now = datetime.utcnow()
+    other_prereq = aliased(WordPrerequisite)
+    prereq_progress = aliased(Progress)
+
+    unmet_prerequisite = (
+        select(other_prereq.id)
+        .outerjoin(
+            prereq_progress,
+            and_(
+                prereq_progress.word_id == other_prereq.prerequisite_id,
+                prereq_progress.child_id == child_id
+            )
+        )
+        .where(
+            other_prereq.word_id == WordPrerequisite.word_id,
+            or_(
+                prereq_progress.status.is_(None),
+                prereq_progress.status != ProgressStatus.MASTERED
+            )
+        )
+    )
+
+    unlockable = select(
+        func.gen_random_uuid(),
+        literal(child_id, Progress.child_id.type),
+        WordPrerequisite.word_id,
+        literal(ProgressStatus.UNLOCKED, Progress.status.type),
+        literal(0),
+        literal(0),
+        literal(0),
+        literal(now, Progress.unlocked_at.type),
+        literal(now, Progress.created_at.type),
+        literal(now, Progress.updated_at.type),
+    ).where(
+        WordPrerequisite.prerequisite_id == word_id,
+        ~unmet_prerequisite.exists()
+    )
+
+    stmt = insert(Progress).from_select(
+        [
+            Progress.id,
+            Progress.child_id,
+            Progress.word_id,
+            Progress.status,
+            Progress.attempts,
+            Progress.correct_count,
+            Progress.streak_count,
+            Progress.unlocked_at,
+            Progress.created_at,
+            Progress.updated_at,
+        ],
+        unlockable
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_child_word",
+        set_={
+            "status": stmt.excluded.status,
+            "unlocked_at": stmt.excluded.unlocked_at,
+            "updated_at": stmt.excluded.updated_at,
+        },
+        where=Progress.status == ProgressStatus.LOCKED
+    ).returning(Progress.word_id)
+
+    result = await db.execute(stmt)
+    return [row[0] for row in result.all()]
+
+
+async def get_children_overview(db: AsyncSession, user_id: uuid.UUID) -> list[dict]:
+    """Status counts, accuracy and last activity for every child of a user.
+
+    One grouped query over children left-joined to their progress rows.
+    """
+    def count_status(progress_status: ProgressStatus):
+        return func.count(Progress.id).filter(Progress.status == progress_status)
+
+    result = await db.execute(
+        select(
+            Child.id,
+            Child.name,
+            Child.preferred_language,
+            Child.avatar_url,
+            func.count(Progress.id).label("total_words"),
+            count_status(ProgressStatus.MASTERED).label("mastered"),
+            count_status(ProgressStatus.PRACTICING).label("practicing"),
+            count_status(ProgressStatus.IN_PROGRESS).label("in_progress"),
+            count_status(ProgressStatus.UNLOCKED).label("unlocked"),
+            count_status(ProgressStatus.LOCKED).label("locked"),
+            func.coalesce(func.sum(Progress.attempts), 0).label("total_attempts"),
+            func.coalesce(func.sum(Progress.correct_count), 0).label("total_correct"),
+            func.max(Progress.last_practiced_at).label("last_practiced_at"),
+        )
+        .outerjoin(Progress, Progress.child_id == Child.id)
+        .where(Child.user_id == user_id)
+        .group_by(Child.id)
+        .order_by(Child.created_at)
+    )
+
+    return [
+        {
+            "child_id": row.id,
+            "name": row.name,
+            "preferred_language": row.preferred_language,
+            "avatar_url": row.avatar_url,
+            "total_words": row.total_words,
+            "mastered": row.mastered,
+            "practicing": row.practicing,
+            "in_progress": row.in_progress,
+            "unlocked": row.unlocked,
+            "locked": row.locked,
+            "total_attempts": row.total_attempts,
+            "total_correct": row.total_correct,
+            "accuracy": round(row.total_correct / row.total_attempts, 2) if row.total_attempts > 0 else 0.0,
+            "last_practiced_at": row.last_practiced_at,
+        }
+        for row in result.all()
+    ]
+
+
+async def record_daily_activity(
+    db: AsyncSession,
+    child_id: uuid.UUID,
+    word_id: uuid.UUID,
+    correct: bool,
+    newly_mastered: bool,
+) -> None:
+    """Add one attempt to today's (child, day, domain) rollup row."""
+    stmt = insert(DailyActivity).from_select(
+        [
+            DailyActivity.child_id,
+            DailyActivity.day,
+            DailyActivity.domain_id,
+            DailyActivity.attempts,
+            DailyActivity.correct_count,
+            DailyActivity.mastered_count,
+        ],
+        select(
+            literal(child_id, DailyActivity.child_id.type),
+            literal(datetime.utcnow().date(), DailyActivity.day.type),
+            Word.domain_id,
+            literal(1),
+            literal(1 if correct else 0),
+            literal(1 if newly_mastered else 0),
+        ).where(Word.id == word_id)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyActivity.child_id, DailyActivity.day, DailyActivity.domain_id],
+        set_={
+            "attempts": DailyActivity.attempts + stmt.excluded.attempts,
+            "correct_count": DailyActivity.correct_count + stmt.excluded.correct_count,
+            "mastered_count": DailyActivity.mastered_count + stmt.excluded.mastered_count,
+        }
+    )
+    await db.execute(stmt)
+
+
+async def get_daily_activity(
+    db: AsyncSession,
+    child_id: uuid.UUID,
+    days: int,
+    domain_id: Optional[uuid.UUID] = None,
+) -> list[dict]:
+    """Per-day totals for the last ``days`` days, oldest first."""
+    first_day = datetime.utcnow().date() - timedelta(days=days - 1)
+    query = (
+        select(
+            DailyActivity.day,
+            func.sum(DailyActivity.attempts).label("attempts"),
+            func.sum(DailyActivity.correct_count).label("correct_count"),
+            func.sum(DailyActivity.mastered_count).label("mastered_count"),
+        )
+        .where(DailyActivity.child_id == child_id, DailyActivity.day >= first_day)
+        .group_by(DailyActivity.day)
+        .order_by(DailyActivity.day)
+    )
+    if domain_id:
+        query = query.where(DailyActivity.domain_id == domain_id)
+
+    result = await db.execute(query)
+    return [
+        {
+            "day": row.day,
+            "attempts": row.attempts,
+            "correct_count": row.correct_count,
+            "mastered_count": row.mastered_count,
+        }
+        for row in result.all()
+    ]
+
+
+async def get_current_streak(db: AsyncSession, child_id: uuid.UUID) -> int:
+    """Consecutive active days ending today, or yesterday if today is still empty.
+
+    Reads at most STREAK_LOOKBACK_DAYS rollup days from the primary key index,
+    so the cost per child is bounded no matter how long it has been active.
+    """
+    today = datetime.utcnow().date()
+    result = await db.execute(
+        select(DailyActivity.day)
+        .where(
+            DailyActivity.child_id == child_id,
+            DailyActivity.day > today - timedelta(days=STREAK_LOOKBACK_DAYS)
+        )
+        .distinct()
+        .order_by(DailyActivity.day.desc())
+    )
+
+    streak = 0
+    expected = today
+    for (day,) in result.all():
+        if day == expected:
+            streak += 1
+        elif streak == 0 and day == today - timedelta(days=1):
+            streak = 1
+            expected = day
+        else:
+            break
+        expected = expected - timedelta(days=1)
+    return streak
+
+
+async def append_attempt_events(db: AsyncSession, events: list[dict]) -> None:
+    """Append attempts to the partitioned event log with one multi-row INSERT.
+
+    Each event needs ``child_id``, ``word_id``, ``correct`` and ``status``;
+    ``domain_id`` and ``created_at`` are optional.
+    """
+    if not events:
+        return
+    await db.execute(insert(AttemptEvent).values(events))
@@ -0,0 +1,415 @@
+import asyncio
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import uuid
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.tasks import task_queue
+from app.database import async_session
+from app.models.domain import Domain
+from app.models.word import Word, WordTranslation, WordPrerequisite
+from app.services.cache_service import on_invalidation, DOMAIN_CONTENT, RESET
+from app.services.graph_service import compute_levels
+
+# System domain content compiled into one read-only file that every worker
+# on the host maps. Records are fixed-size little-endian structs; strings are
+# offsets into a trailing table of length-prefixed UTF-8 values.
+MAGIC = b"LTSYSCNT"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<8sI16sIIIII")      # magic, version, fingerprint, counts, strings size
+DOMAIN = struct.Struct("<16sIIIIIqII")      # id, name, description, icon, color, content_version, created_at, word range
+WORD = struct.Struct("<16sIiHIqIHIH")       # id, difficulty, sort_order, level, image_url, created_at, translations, edges
+TRANSLATION = struct.Struct("<16sIIII")     # id, language, text, phonetic, example_sentence
+EDGE = struct.Struct("<16s")                # prerequisite word id
+STRING_LENGTH = struct.Struct("<I")
+
+NO_STRING = 0xFFFFFFFF
+NO_SORT_ORDER = -2 ** 31
+NO_TIMESTAMP = -2 ** 63
+EPOCH = datetime(1970, 1, 1)
+
+
+class SnapshotTranslation(NamedTuple):
+    id: uuid.UUID
+    language: str
+    text: str
+    phonetic: Optional[str]
+    example_sentence: Optional[str]
+
+
+class SnapshotWord(NamedTuple):
+    id: uuid.UUID
+    domain_id: uuid.UUID
+    difficulty: str
+    image_url: Optional[str]
+    sort_order: Optional[int]
+    created_at: Optional[datetime]
+    translations: list
+    level: int
+
+
+class SnapshotDomain(NamedTuple):
+    id: uuid.UUID
+    name: str
+    description: Optional[str]
+    icon: Optional[str]
+    color: Optional[str]
+    content_version: int
+    created_at: Optional[datetime]
+    word_count: int
+
+
+def _timestamp(value: Optional[datetime]) -> int:
+    """Naive datetime as whole microseconds since the epoch."""
+    if value is None:
+        return NO_TIMESTAMP
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _datetime(value: int) -> Optional[datetime]:
+    return None if value == NO_TIMESTAMP else EPOCH + timedelta(microseconds=value)
+
+
+def fingerprint_domains(rows) -> bytes:
+    """Digest of (id, content_version, updated_at) of every system domain."""
+    digest = hashlib.blake2b(digest_size=16)
+    for domain_id, content_version, updated_at in sorted(rows, key=lambda row: str(row[0])):
+        digest.update(f"{domain_id}:{content_version}:{updated_at}\n".encode())
+    return digest.digest()
+
+
+class _StringTable:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets: dict[str, int] = {}
+
+    def ref(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        offset = self.offsets.get(value)
+        if offset is None:
+            encoded = value.encode()
+            offset = len(self.data)
+            self.data += STRING_LENGTH.pack(len(encoded)) + encoded
+            self.offsets[value] = offset
+        return offset
+
+
+def encode_snapshot(fingerprint: bytes, domains: list, words: list, translations: dict, edges: dict) -> bytes:
+    """Pack system content into the snapshot layout.
+
+    ``translations`` and ``edges`` map a word id to its rows.
+    """
+    strings = _StringTable()
+    levels = compute_levels([w.id for w in words], [
+        (word_id, prereq_id) for word_id, prereq_ids in edges.items() for prereq_id in prereq_ids
+    ])
+
+    domain_records = []
+    word_records = []
+    translation_records = []
+    edge_records = []
+
+    words_by_domain = {}
+    for w in words:
+        words_by_domain.setdefault(w.domain_id, []).append(w)
+
+    word_start = 0
+    for domain in domains:
+        domain_words = words_by_domain.get(domain.id, [])
+        domain_records.append(DOMAIN.pack(
+            domain.id.bytes,
+            strings.ref(domain.name),
+            strings.ref(domain.description),
+            strings.ref(domain.icon),
+            strings.ref(domain.color),
+            domain.content_version,
+            _timestamp(domain.created_at),
+            word_start,
+            len(domain_words),
+        ))
+        word_start += len(domain_words)
+
+        for w in domain_words:
+            word_translations = translations.get(w.id, [])
+            word_edges = edges.get(w.id, [])
+            word_records.append(WORD.pack(
+                w.id.bytes,
+                strings.ref(w.difficulty),
+                NO_SORT_ORDER if w.sort_order is None else w.sort_order,
+                levels.get(w.id, 0),
+                strings.ref(w.image_url),
+                _timestamp(w.created_at),
+                len(translation_records),
+                len(word_translations),
+                len(edge_records),
+                len(word_edges),
+            ))
+            for t in word_translations:
+                translation_records.append(TRANSLATION.pack(
+                    t.id.bytes,
+                    strings.ref(t.language),
+                    strings.ref(t.text),
+                    strings.ref(t.phonetic),
+                    strings.ref(t.example_sentence),
+                ))
+            for prereq_id in word_edges:
+                edge_records.append(EDGE.pack(prereq_id.bytes))
+
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        fingerprint,
+        len(domain_records),
+        len(word_records),
+        len(translation_records),
+        len(edge_records),
+        len(strings.data),
+    )
+    return b"".join([header, *domain_records, *word_records, *translation_records, *edge_records, bytes(strings.data)])
+
+
+class SystemContentSnapshot:
+    """Read-only view over a memory-mapped snapshot file.
+
+    Pages are shared by every process mapping the same file, so memory does
+    not grow with the number of workers. Lookups decode only the records of
+    the requested domain.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version, fingerprint, domains, words, translations, edges, _ = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a system content snapshot")
+
+        self.fingerprint = fingerprint
+        self._domains_at = HEADER.size
+        self._words_at = self._domains_at + domains * DOMAIN.size
+        self._translations_at = self._words_at + words * WORD.size
+        self._edges_at = self._translations_at + translations * TRANSLATION.size
+        self._strings_at = self._edges_at + edges * EDGE.size
+
+        self._domain_index = {}
+        for index in range(domains):
+            record = DOMAIN.unpack_from(self._buffer, self._domains_at + index * DOMAIN.size)
+            self._domain_index[uuid.UUID(bytes=record[0])] = record
+
+    def close(self) -> None:
+        self._buffer.release()
+        self._mmap.close()
+
+    def _string(self, ref: int) -> Optional[str]:
+        if ref == NO_STRING:
+            return None
+        start = self._strings_at + ref
+        (length,) = STRING_LENGTH.unpack_from(self._buffer, start)
+        start += STRING_LENGTH.size
+        return str(self._buffer[start:start + length], "utf-8")
+
+    def has_domain(self, domain_id: uuid.UUID) -> bool:
+        return domain_id in self._domain_index
+
+    def domain(self, domain_id: uuid.UUID) -> Optional[SnapshotDomain]:
+        record = self._domain_index.get(domain_id)
+        if record is None:
+            return None
+        raw_id, name, description, icon, color, content_version, created_at, _, word_count = record
+        return SnapshotDomain(
+            id=domain_id,
+            name=self._string(name),
+            description=self._string(description),
+            icon=self._string(icon),
+            color=self._string(color),
+            content_version=content_version,
+            created_at=_datetime(created_at),
+            word_count=word_count,
+        )
+
+    def words(self, domain_id: uuid.UUID) -> tuple[list[SnapshotWord], list[tuple]]:
+        """Words of a domain in sort order and their (word_id, prerequisite_id) edges."""
+        record = self._domain_index.get(domain_id)
+        if record is None:
+            return [], []
+
+        word_start, word_count = record[7], record[8]
+        words = []
+        edges = []
+        for index in range(word_start, word_start + word_count):
+            (raw_id, difficulty, sort_order, level, image_url, created_at,
+             trans_start, trans_count, edge_start, edge_count) = WORD.unpack_from(
+                self._buffer, self._words_at + index * WORD.size
+            )
+            word_id = uuid.UUID(bytes=raw_id)
+
+            translations = []
+            for t_index in range(trans_start, trans_start + trans_count):
+                t_id, language, text, phonetic, example = TRANSLATION.unpack_from(
+                    self._buffer, self._translations_at + t_index * TRANSLATION.size
+                )
+                translations.append(SnapshotTranslation(
+                    id=uuid.UUID(bytes=t_id),
+                    language=self._string(language),
+                    text=self._string(text),
+                    phonetic=self._string(phonetic),
+                    example_sentence=self._string(example),
+                ))
+
+            for e_index in range(edge_start, edge_start + edge_count):
+                (prereq_id,) = EDGE.unpack_from(self._buffer, self._edges_at + e_index * EDGE.size)
+                edges.append((word_id, uuid.UUID(bytes=prereq_id)))
+
+            words.append(SnapshotWord(
+                id=word_id,
+                domain_id=domain_id,
+                difficulty=self._string(difficulty),
+                image_url=self._string(image_url),
+                sort_order=None if sort_order == NO_SORT_ORDER else sort_order,
+                created_at=_datetime(created_at),
+                translations=translations,
+                level=level,
+            ))
+        return words, edges
+
+
+async def system_content_fingerprint(db: AsyncSession) -> bytes:
+    result = await db.execute(
+        select(Domain.id, Domain.content_version, Domain.updated_at).where(Domain.is_system == True)
+    )
+    return fingerprint_domains(result.all())
+
+
+async def compile_system_snapshot(db: AsyncSession) -> bytes:
+    """Read every system domain and return the encoded snapshot."""
+    domains_result = await db.execute(
+        select(Domain).where(Domain.is_system == True).order_by(Domain.id)
+    )
+    domains = domains_result.scalars().all()
+    fingerprint = fingerprint_domains([(d.id, d.content_version, d.updated_at) for d in domains])
+
+    words_result = await db.execute(
+        select(Word)
+        .join(Domain, Word.domain_id == Domain.id)
+        .where(Domain.is_system == True)
+        .order_by(Word.domain_id, Word.sort_order)
+    )
+    words = words_result.scalars().all()
+
+    translations_result = await db.execute(
+        select(WordTranslation)
+        .join(Word, WordTranslation.word_id == Word.id)
+        .join(Domain, Word.domain_id == Domain.id)
+        .where(Domain.is_system == True)
+        .order_by(WordTranslation.word_id, WordTranslation.created_at)
+    )
+    translations = {}
+    for t in translations_result.scalars().all():
+        translations.setdefault(t.word_id, []).append(t)
+
+    edges_result = await db.execute(
+        select(WordPrerequisite.word_id, WordPrerequisite.prerequisite_id)
+        .join(Word, WordPrerequisite.word_id == Word.id)
+        .join(Domain, Word.domain_id == Domain.id)
+        .where(Domain.is_system == True)
+    )
+    edges = {}
+    for word_id, prereq_id in edges_result.all():
+        edges.setdefault(word_id, []).append(prereq_id)
+
+    return encode_snapshot(fingerprint, domains, words, translations, edges)
+
+
+def _open_snapshot(path: str, fingerprint: bytes) -> Optional[SystemContentSnapshot]:
+    try:
+        snapshot = SystemContentSnapshot(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if snapshot.fingerprint != fingerprint:
+        snapshot.close()
+        return None
+    return snapshot
+
+
+def _lock(path: str) -> int:
+    fd = os.open(path + ".lock", os.O_CREAT | os.O_RDWR, 0o644)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    return fd
+
+
+def _unlock(fd: int) -> None:
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+_snapshot: Optional[SystemContentSnapshot] = None
+
+
+def get_system_snapshot() -> Optional[SystemContentSnapshot]:
+    """The mapped snapshot, or None while it is missing or being rebuilt."""
+    return _snapshot
+
+
+def _replace_snapshot(snapshot: Optional[SystemContentSnapshot]) -> None:
+    global _snapshot
+    previous, _snapshot = _snapshot, snapshot
+    if previous is not None and previous is not snapshot:
+        previous.close()
+
+
+def close_system_snapshot() -> None:
+    _replace_snapshot(None)
+
+
+async def load_system_snapshot(path: Optional[str] = None) -> SystemContentSnapshot:
+    """Map the snapshot file, rebuilding it first if it does not match the database.
+
+    Workers take a file lock around the rebuild, so when several start at
+    once only the first compiles the file and the rest map its result.
+    """
+    path = path or get_settings().system_snapshot_path
+    async with async_session() as db:
+        fingerprint = await system_content_fingerprint(db)
+
+        snapshot = _open_snapshot(path, fingerprint)
+        if snapshot is None:
+            fd = await asyncio.to_thread(_lock, path)
+            try:
+                snapshot = _open_snapshot(path, fingerprint)
+                if snapshot is None:
+                    data = await compile_system_snapshot(db)
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+                    snapshot = SystemContentSnapshot(path)
+            finally:
+                _unlock(fd)
+
+    _replace_snapshot(snapshot)
+    return snapshot
+
+
+@on_invalidation(DOMAIN_CONTENT)
+def _drop_changed_system_domain(value: Optional[str]) -> None:
+    if _snapshot is not None and _snapshot.has_domain(uuid.UUID(value)):
+        # Serve from the database until the rebuilt snapshot is mapped
+        _replace_snapshot(None)
+        task_queue.submit("system-snapshot", load_system_snapshot)
+
+
+@on_invalidation(RESET)
+def _recheck_system_snapshot(value: Optional[str]) -> None:
+    # Events may have been missed; reloading is cheap when the file is current
+    task_queue.submit("system-snapshot", load_system_snapshot)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Measure per-child query latency as the progress and chat tables grow.
+
+Adds children with progress rows on every active word, a chat session and a
+few messages each, in steps, and after every step times the per-child
+queries of the progress and chat endpoints on randomly picked children. It
+also reports how many partitions each query plan touches. Needs a seeded
+database; everything it adds hangs off one user that is deleted at the end.
+Run from the backend directory:
+
+    python benchmarks/child_partitions.py --steps 1000 5000 20000
+"""
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects import postgresql
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import async_session, dispose_engine, get_engine  # noqa: E402
+from app.models.chat import ChatMessage, ChatSession  # noqa: E402
+from app.models.progress import Progress  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.core.constants import ProgressStatus  # noqa: E402
+
+MESSAGES_PER_SESSION = 6
+
+_ADD_CHILDREN = text("""
+INSERT INTO children (id, user_id, name, preferred_language, created_at)
+SELECT gen_random_uuid(), :user_id, 'bench ' || g, 'en', now()
+FROM generate_series(1, :count) g
+RETURNING id
+""")
+
+_ADD_PROGRESS = text("""
+INSERT INTO progress (id, child_id, word_id, status, attempts, correct_count, streak_count, created_at, updated_at)
+SELECT gen_random_uuid(), c.id, w.id,
+       (ARRAY['UNLOCKED', 'IN_PROGRESS', 'PRACTICING', 'MASTERED'])[1 + floor(random() * 4)::int]::progressstatus,
+       3, 2, 1, now(), now()
+FROM unnest(CAST(:child_ids AS uuid[])) AS c(id)
+CROSS JOIN words w
+WHERE w.is_active
+""")
+
+_ADD_SESSIONS = text("""
+INSERT INTO chat_sessions (id, child_id, started_at, message_count)
+SELECT gen_random_uuid(), c.id, now(), :messages
+FROM unnest(CAST(:child_ids AS uuid[])) AS c(id)
+""")
+
+_ADD_MESSAGES = text("""
+INSERT INTO chat_messages (id, session_id, child_id, role, content, created_at)
+SELECT gen_random_uuid(), s.id, s.child_id,
+       CASE WHEN g % 2 = 1 THEN 'user' ELSE 'assistant' END,
+       'message ' || g, now() + g * interval '1 second'
+FROM chat_sessions s
+CROSS JOIN generate_series(1, :messages) g
+WHERE s.child_id = ANY(CAST(:child_ids AS uuid[]))
+""")
+
+_PARTITION = re.compile(r" on (\w+_p\d+)")
+
+
+def child_queries(child_id: uuid.UUID, session_id: uuid.UUID) -> dict:
+    """The per-child statements issued by the progress and chat endpoints."""
+    return {
+        "progress list": select(Progress).where(Progress.child_id == child_id),
+        "progress by status": select(Progress).where(
+            Progress.child_id == child_id,
+            Progress.status == ProgressStatus.PRACTICING
+        ),
+        "chat session": select(ChatSession).where(
+            ChatSession.id == session_id,
+            ChatSession.child_id == child_id
+        ),
+        "chat history": select(ChatMessage).where(
+            ChatMessage.session_id == session_id,
+            ChatMessage.child_id == child_id
+        ).order_by(ChatMessage.created_at),
+    }
+
+
+async def add_children(db, user_id: uuid.UUID, count: int, batch: int = 1000) -> list[uuid.UUID]:
+    added = []
+    while len(added) < count:
+        size = min(batch, count - len(added))
+        result = await db.execute(_ADD_CHILDREN, {"user_id": user_id, "count": size})
+        child_ids = list(result.scalars().all())
+        params = {"child_ids": child_ids, "messages": MESSAGES_PER_SESSION}
+        await db.execute(_ADD_PROGRESS, params)
+        await db.execute(_ADD_SESSIONS, params)
+        await db.execute(_ADD_MESSAGES, params)
+        await db.commit()
+        added.extend(child_ids)
+    return added
+
+
+async def partitions_scanned(db, statement) -> int:
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    result = await db.execute(text(f"EXPLAIN {sql}"))
+    return len({match for (line,) in result.all() for match in _PARTITION.findall(line)})
+
+
+async def measure(db, children: list, samples: int) -> dict:
+    picked = random.sample(children, min(samples, len(children)))
+    sessions = dict((await db.execute(
+        select(ChatSession.child_id, ChatSession.id).where(ChatSession.child_id.in_(picked))
+    )).all())
+
+    timings, scanned = {}, {}
+    for child_id in picked:
+        for name, statement in child_queries(child_id, sessions[child_id]).items():
+            started = time.perf_counter()
+            (await db.execute(statement)).all()
+            timings.setdefault(name, []).append(time.perf_counter() - started)
+    for name, statement in child_queries(picked[0], sessions[picked[0]]).items():
+        scanned[name] = await partitions_scanned(db, statement)
+    return {name: (timings[name], scanned[name]) for name in timings}
+
+
+async def table_rows(db) -> int:
+    result = await db.execute(text("SELECT count(*) FROM progress"))
+    return result.scalar()
+
+
+async def run(steps: list[int], samples: int) -> None:
+    # Statement logging would dominate the timings
+    get_engine().echo = False
+    async with async_session() as db:
+        user_id = uuid.uuid4()
+        db.add(User(id=user_id, email=f"bench-{user_id.hex[:8]}@example.com", password_hash="-"))
+        await db.commit()
+
+        children = []
+        try:
+            for target in steps:
+                children += await add_children(db, user_id, target - len(children))
+                await db.execute(text("ANALYZE progress, chat_sessions, chat_messages"))
+                rows = await table_rows(db)
+                print(f"\n{len(children)} children, {rows} progress rows")
+                for name, (timing, scanned) in (await measure(db, children, samples)).items():
+                    print(
+                        f"  {name:<20} median {statistics.median(timing) * 1000:7.2f} ms   "
+                        f"p95 {sorted(timing)[int(len(timing) * 0.95) - 1] * 1000:7.2f} ms   "
+                        f"partitions {scanned}"
+                    )
+        finally:
+            await db.rollback()
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+    await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[1000, 5000, 20000],
+                        help="total number of benchmark children after each step")
+    parser.add_argument("--samples", type=int, default=200, help="children timed per step")
+    args = parser.parse_args()
+    asyncio.run(run(sorted(args.steps), args.samples))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Measure cold import time and time-to-first-request of the backend.
+
+Every measurement runs in a fresh interpreter so nothing is cached between
+runs. Run from the backend directory:
+
+    python benchmarks/startup.py --runs 5
+
+Time-to-first-request starts uvicorn and polls /health until it answers.
+It needs a reachable, migrated database: startup creates the current
+attempt_events partition and loads token revocations before serving. Use
+--skip-server to measure imports only.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_TARGETS = {
+    "models": "import app.models",
+    "main (module)": "import app.main",
+    "main (app built)": "import app.main; app.main.create_app()",
+}
+
+TIMER = (
+    "import time; _t = time.perf_counter(); {statement}; "
+    "print(time.perf_counter() - _t)"
+)
+
+
+def measure_import(statement: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", TIMER.format(statement=statement)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_error(log) -> str:
+    log.seek(0)
+    return log.read().decode(errors="replace").strip() or "(no output)"
+
+
+def measure_first_request(timeout: float = 30.0) -> float:
+    port = _free_port()
+    with tempfile.TemporaryFile() as log:
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+        try:
+            while time.perf_counter() - started < timeout:
+                # Startup fails fast when the database is unreachable or not migrated
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited during startup:\n{_server_error(log)}")
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                        if response.status == 200:
+                            return time.perf_counter() - started
+                except OSError:
+                    time.sleep(0.01)
+            raise TimeoutError(f"server did not answer /health in time:\n{_server_error(log)}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def report(name: str, samples: list[float]) -> None:
+    print(
+        f"{name:<24} median {statistics.median(samples) * 1000:8.1f} ms   "
+        f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-server", action="store_true", help="only measure imports")
+    args = parser.parse_args()
+
+    for name, statement in IMPORT_TARGETS.items():
+        report(f"import {name}", [measure_import(statement) for _ in range(args.runs)])
+
+    if not args.skip_server:
+        report("first request", [measure_first_request() for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
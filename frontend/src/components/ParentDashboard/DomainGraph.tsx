@@ -13,6 +13,7 @@ interface DomainGraphProps {
 interface WordNodeData {
   label: string
   difficulty: 'beginner' | 'intermediate' | 'advanced'
+  status?: string | null
 }
 
 function WordNode({ data }: { data: WordNodeData }) {
@@ -34,8 +35,19 @@ function WordNode({ data }: { data: WordNodeData }) {
     }
   }
 
+  // The child's progress: a ring once mastered, faded until started
+  const getStatusStyle = (status?: string | null) => {
+    switch (status) {
+      case 'mastered': return 'ring-4 ring-blue-400'
+      case 'in_progress':
+      case 'practicing': return 'ring-2 ring-blue-200'
+      case 'unlocked': return ''
+      default: return 'opacity-50'
+    }
+  }
+
   return (
-    <div className={`${getNodeColor(data.difficulty)} ${getNodeSize(data.difficulty)} rounded-full border-2 flex items-center justify-center p-2 text-xs font-medium text-center`}>
+    <div className={`${getNodeColor(data.difficulty)} ${getNodeSize(data.difficulty)} ${getStatusStyle(data.status)} rounded-full border-2 flex items-center justify-center p-2 text-xs font-medium text-center`}>
       {data.label}
     </div>
   )
@@ -46,15 +58,17 @@ const nodeTypes = {
   wordNode: WordNode
 }
 
-// Transform LearningGraph data to ReactFlow nodes using levels array for positioning
+// Transform LearningGraph data to ReactFlow nodes. Uses the server-computed
+// positions when present, else places nodes on a grid by level.
 function transformToReactFlowNodes(graph: LearningGraph): Node[] {
   const nodes: Node[] = []
+  const nodesById = new Map(graph.nodes.map(n => [n.id, n]))
 
   // Iterate through levels array to position nodes hierarchically
   graph.levels.forEach((level, levelIndex) => {
     level.forEach((nodeId, indexInLevel) => {
       // Find the corresponding graph node
-      const graphNode = graph.nodes.find(n => n.id === nodeId)
+      const graphNode = nodesById.get(nodeId)
       if (!graphNode) return
 
       // Get label from translations (prefer en, fallback to pl, es, or '?')
@@ -64,7 +78,7 @@ function transformToReactFlowNodes(graph: LearningGraph): Node[] {
       // Calculate position based on level structure
       // Y-axis: levelIndex × 150 (vertical spacing between levels)
       // X-axis: indexInLevel × 200 (horizontal spacing within level)
-      const position = {
+      const position = graph.positions?.[nodeId] ?? {
         x: indexInLevel * 200,
         y: levelIndex * 150
       }
@@ -75,7 +89,8 @@ function transformToReactFlowNodes(graph: LearningGraph): Node[] {
         position,
         data: {
           label,
-          difficulty: graphNode.difficulty as 'beginner' | 'intermediate' | 'advanced'
+          difficulty: graphNode.difficulty as 'beginner' | 'intermediate' | 'advanced',
+          status: graphNode.status
         }
       })
     })
@@ -100,12 +115,12 @@ export default function DomainGraph({ domainId, childId }: DomainGraphProps) {
 
   useEffect(() => {
     loadGraph()
-  }, [domainId])
+  }, [domainId, childId])
 
   const loadGraph = async () => {
     setIsLoading(true)
     try {
-      const data = await domainService.getDomainGraph(domainId)
+      const data = await domainService.getDomainGraph(domainId, { layout: true, childId })
       const reactFlowNodes = transformToReactFlowNodes(data)
       const reactFlowEdges = transformToReactFlowEdges(data)
       setNodes(reactFlowNodes)
@@ -50,8 +50,20 @@ export async function createWord(data: CreateWordData): Promise<Word> {
   return response.data
 }
 
-export async function getDomainGraph(domainId: string): Promise<LearningGraph> {
-  const response = await api.get<LearningGraph>(`/domains/${domainId}/graph`)
+export interface GraphOptions {
+  layout?: boolean
+  childId?: string
+  levelCounts?: boolean
+}
+
+export async function getDomainGraph(domainId: string, options: GraphOptions = {}): Promise<LearningGraph> {
+  const response = await api.get<LearningGraph>(`/domains/${domainId}/graph`, {
+    params: {
+      layout: options.layout || undefined,
+      child_id: options.childId,
+      level_counts: options.levelCounts || undefined
+    }
+  })
   return response.data
 }
 
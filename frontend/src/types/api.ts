@@ -72,6 +72,10 @@ export interface GraphNode {
   image_url?: string
   translations: Record<string, string>
   sort_order: number
+  // Present when the graph is requested with a child_id; null if not started
+  status?: string | null
+  accuracy?: number | null
+  last_practiced_at?: string | null
 }
 
 export interface GraphEdge {
@@ -79,12 +83,20 @@ export interface GraphEdge {
   to: string
 }
 
+export interface GraphPosition {
+  x: number
+  y: number
+}
+
 export interface LearningGraph {
   domain_id: string
   domain_name: string
   nodes: GraphNode[]
   edges: GraphEdge[]
   levels: string[][]
+  // Server-computed layered layout, present when requested with layout=true
+  positions?: Record<string, GraphPosition>
+  level_counts?: Array<{ level: number; total: number; mastered: number; started: number }> | null
 }
 
 export interface ChatMessage {